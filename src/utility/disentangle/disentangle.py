@@ -1,11 +1,27 @@
 import numpy as np
+import os
+import copy
+import contextlib
+import concurrent.futures
+import collections
+import hashlib
+import threading
 from .. import utility
 from . import disentangle_renyi_alpha
 from . import disentangle_trunc_error
 from . import disentangle_renyi_alpha_trunc_error
 from .. import debug_logging
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
 
-def initialize_disentangle(theta, init_U="polar", N_iters_pre_disentangler=200):
+# Cache of disentangling unitaries used by disentangle_cached(), see below.
+_disentangle_cache = collections.OrderedDict()
+_disentangle_cache_lock = threading.Lock()
+_disentangle_cache_maxsize = 256
+
+def initialize_disentangle(theta, init_U="polar", N_iters_pre_disentangler=200, U0=None):
     """
     Initializes the disentangling procedure by computing an initial disentangling unitary U0 and applying it to the
     wavefunction tensor theta.
@@ -19,6 +35,9 @@ def initialize_disentangle(theta, init_U="polar", N_iters_pre_disentangler=200):
     N_iters_pre_disentangler : int, optional
         number of pre-disentangling iterations done before tha actual call to the disentangler. The pre-disentangler
         uses the fast power method to minimize the renyi-2 entropy. Default : 200.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        if this is not None, U0 is used as the initial disentangling unitary instead of the one selected by init_U,
+        e.g. the disentangling unitary of a neighbouring tensor. Default : None.
 
     Returns
     -------
@@ -29,7 +48,12 @@ def initialize_disentangle(theta, init_U="polar", N_iters_pre_disentangler=200):
     """
     # Initialize disentangling unitary
     ml, d1, d2, mr = theta.shape
-    if init_U == "identity":
+    if U0 is not None:
+        if U0.shape != (d1, d2, d1, d2):
+            raise ValueError(f"U0 must be of shape {(d1, d2, d1, d2)}, but is of shape {U0.shape}")
+        theta = np.tensordot(U0, theta, ([2, 3], [1, 2])).transpose(2, 0, 1, 3) # i j [i*] [j*]; ml [d1] [d2] mr -> i j ml mr -> ml i j mr { D^6 }
+        U0 = U0.reshape(d1*d2, d1*d2)
+    elif init_U == "identity":
         U0 = np.eye(d1*d2)
     elif init_U == "polar":
         # Polar initialization taken from [1, 2].
@@ -75,7 +99,7 @@ def initialize_disentangle(theta, init_U="polar", N_iters_pre_disentangler=200):
     
     return U0, theta
 
-def disentangle(theta, mode="renyi", init_U="polar", N_iters_pre_disentangler=200, chi=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle(theta, mode="renyi", init_U="polar", N_iters_pre_disentangler=200, chi=None, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles a given wavefunction tensor theta by optimizing over the unitary U:
     
@@ -112,6 +136,11 @@ def disentangle(theta, mode="renyi", init_U="polar", N_iters_pre_disentangler=20
     chi : int or None, optional
         truncated bond dimension used for the computation of the truncation error cost function.
         this parameter is not needed when using "trunc" as the cost function.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        if this is not None, the disentangler is warm-started from U0 instead of the unitary selected by init_U.
+        Passing the disentangling unitary of a nearby tensor (e.g. of the previous tile in a TPS sweep) can
+        considerably reduce the number of iterations. The pre-disentangler is still run on top of U0,
+        set N_iters_pre_disentangler=0 to skip it. Default : None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -125,7 +154,7 @@ def disentangle(theta, mode="renyi", init_U="polar", N_iters_pre_disentangler=20
     """
     _, d1, d2, _ = theta.shape
     # Initialize disentangling unitary
-    U0, theta = initialize_disentangle(theta, init_U, N_iters_pre_disentangler)
+    U0, theta = initialize_disentangle(theta, init_U, N_iters_pre_disentangler, U0=U0)
     if debug_logger.disentangling_log_iterates:
         debug_logger.append_to_log_list(("disentangler_info", "U0s"), U0.reshape(d1, d2, d1, d2))
     # Perform disentangling
@@ -153,4 +182,157 @@ def disentangle(theta, mode="renyi", init_U="polar", N_iters_pre_disentangler=20
 
     # Compute final disentangling tensor
     U = np.dot(U.reshape(d1*d2, d1*d2), U0).reshape(d1, d2, d1, d2)
-    return U
\ No newline at end of file
+    return U
+
+def _merge_log_dicts(target, source):
+    """
+    Recursively appends the logged lists of the dictionary source to the ones in the dictionary target.
+
+    Parameters
+    ----------
+    target : dict
+        dictionary the entries are appended to (e.g. DebugLogger.log_dict).
+    source : dict
+        dictionary with the same nested structure of lists, whose entries are appended to target.
+    """
+    for key, value in source.items():
+        if isinstance(value, dict):
+            _merge_log_dicts(target.setdefault(key, {}), value)
+        else:
+            target.setdefault(key, []).extend(value)
+
+def disentangle_many(thetas, mode="renyi", init_U="polar", N_iters_pre_disentangler=200, chi=None, N_threads=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
+    """
+    Disentangles a list of independent wavefunction tensors, by calling disentangle() for each of them.
+    The calls are distributed over a pool of threads. Since numpy releases the GIL during the linear algebra,
+    this scales with the number of cores. To avoid oversubscription, the BLAS thread pools are limited to a
+    single thread while the disentanglers are running, if threadpoolctl is available.
+
+    Parameters
+    ----------
+    thetas : list of np.ndarray of shape (l, i, j, r)
+        wavefunction tensors to be disentangled. The shapes may differ between the tensors.
+    mode, init_U, N_iters_pre_disentangler, chi :
+        see disentangle(). The same options are used for all tensors.
+    N_threads : int or None, optional
+        number of threads used. If this is None, os.cpu_count() threads are used. Default: None.
+    debug_logger : DebugLogger instance, optional
+        DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
+        Each thread logs into its own copy of the logger, and the logs are appended to debug_logger in
+        the order of thetas after all disentanglers have finished.
+    **kwargs
+        remaining kwargs are passed into disentangle().
+
+    Returns
+    -------
+    Us : list of np.ndarray of shape (i, j, i*, j*)
+        final disentangling unitaries, in the same order as thetas.
+    """
+    if N_threads is None:
+        N_threads = os.cpu_count() or 1
+    N_threads = min(N_threads, len(thetas))
+    if N_threads <= 1:
+        return [disentangle(theta, mode=mode, init_U=init_U, N_iters_pre_disentangler=N_iters_pre_disentangler, chi=chi, debug_logger=debug_logger, **kwargs) for theta in thetas]
+    # The DebugLogger is not thread safe, so every problem gets its own (empty) copy of it
+    debug_loggers = []
+    for _ in thetas:
+        temp = copy.copy(debug_logger)
+        temp.log_dict = {}
+        debug_loggers.append(temp)
+    def disentangle_single(theta, debug_logger):
+        return disentangle(theta, mode=mode, init_U=init_U, N_iters_pre_disentangler=N_iters_pre_disentangler, chi=chi, debug_logger=debug_logger, **kwargs)
+    if threadpoolctl is not None:
+        limit_blas_threads = threadpoolctl.threadpool_limits(limits=1, user_api="blas")
+    else:
+        limit_blas_threads = contextlib.nullcontext()
+    with limit_blas_threads:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=N_threads) as executor:
+            Us = list(executor.map(disentangle_single, thetas, debug_loggers))
+    for temp in debug_loggers:
+        _merge_log_dicts(debug_logger.log_dict, temp.log_dict)
+    return Us
+
+def _cache_key_value(value):
+    """
+    Converts an argument of disentangle() into a hashable part of the cache key. Arrays enter through a 128 bit
+    blake2b hash of their raw bytes, together with their shape and dtype. Their repr cannot be used, because numpy
+    abbreviates the repr of large arrays. Dicts, lists and tuples are converted recursively.
+
+    Parameters
+    ----------
+    value : object
+        argument of disentangle().
+
+    Returns
+    -------
+    key : hashable object
+        the part of the cache key corresponding to value.
+    """
+    if isinstance(value, np.ndarray):
+        value = np.ascontiguousarray(value)
+        return ("ndarray", hashlib.blake2b(value.view(np.uint8), digest_size=16).digest(), value.shape, value.dtype.str)
+    if isinstance(value, dict):
+        return ("dict", tuple(sorted((key, _cache_key_value(item)) for key, item in value.items())))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_cache_key_value(item) for item in value))
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError(f"argument of type {type(value)} cannot be used as part of the key of disentangle_cached()") from None
+    return value
+
+def _disentangle_cache_key(theta, mode, init_U, N_iters_pre_disentangler, chi, U0, kwargs):
+    """
+    Computes the key under which the result of disentangle() is stored in the cache, see _cache_key_value().
+
+    Parameters
+    ----------
+    theta : np.ndarray of shape (l, i, j, r)
+        wavefunction tensor.
+    mode, init_U, N_iters_pre_disentangler, chi, U0, kwargs :
+        remaining arguments of disentangle().
+
+    Returns
+    -------
+    key : tuple
+        hashable cache key.
+    """
+    return (_cache_key_value(theta), mode, init_U, N_iters_pre_disentangler, chi, _cache_key_value(U0), _cache_key_value(kwargs))
+
+def disentangle_cached(theta, mode="renyi", init_U="polar", N_iters_pre_disentangler=200, chi=None, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
+    """
+    Same as disentangle(), but the resulting disentangling unitaries are stored in a least-recently-used cache of
+    size 256. If the same wavefunction tensor (bitwise identical) is disentangled again with the same options,
+    the cached unitary is returned without running the disentangler. This is useful e.g. for TPS with many identical
+    tiles. Calls that hit the cache do not log any debug information. The cache is thread safe, such that this function
+    can be used together with disentangle_many().
+
+    Parameters
+    ----------
+    See disentangle().
+
+    Returns
+    -------
+    U_final : np.ndarray of shape (i, j, i*, j*)
+        final disentangling unitary after optimization
+    """
+    key = _disentangle_cache_key(theta, mode, init_U, N_iters_pre_disentangler, chi, U0, kwargs)
+    with _disentangle_cache_lock:
+        U = _disentangle_cache.get(key)
+        if U is not None:
+            _disentangle_cache.move_to_end(key)
+            return U.copy()
+    U = disentangle(theta, mode=mode, init_U=init_U, N_iters_pre_disentangler=N_iters_pre_disentangler, chi=chi, U0=U0, debug_logger=debug_logger, **kwargs)
+    with _disentangle_cache_lock:
+        _disentangle_cache[key] = U.copy()
+        _disentangle_cache.move_to_end(key)
+        while len(_disentangle_cache) > _disentangle_cache_maxsize:
+            _disentangle_cache.popitem(last=False)
+    return U
+
+def clear_disentangle_cache():
+    """
+    Removes all entries from the cache used by disentangle_cached().
+    """
+    with _disentangle_cache_lock:
+        _disentangle_cache.clear()
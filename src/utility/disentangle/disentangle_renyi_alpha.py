@@ -7,10 +7,10 @@ from ..riemannian_optimization import stiefel_manifold
 from . import renyiAlphaIterate
 from .. import debug_logging
 
-def disentangle_CG(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_CG(theta, renyi_alpha=0.5, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi-entropy, using Conjugate Gradients.
-    The disentangling unitary is initialized with identity.
+    The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -18,6 +18,12 @@ def disentangle_CG(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogge
         wavefunction tensor to be disentangled.
     renyi_alpha : float, optional
         renyi alpha. Default: 0.5.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -29,12 +35,12 @@ def disentangle_CG(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogge
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
     # Perform TRM optimization
-    construct_new_iterate = lambda U, _ : renyiAlphaIterate.RenyiAlphaIterateCG(U, theta, renyi_alpha, chi_max=None, N_iters_svd=None, eps_svd=0, old_iterate=None)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    construct_new_iterate = conjugate_gradients.IterateFactory(renyiAlphaIterate.RenyiAlphaIterateCG, theta, warm_start=False, alpha=renyi_alpha)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     conjugateGradientsOptimizer = conjugate_gradients.ConjugateGradientsOptimizer(manifold=manifold, construct_iterate=construct_new_iterate, **kwargs)
     iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(construct_new_iterate(U0, None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
     if debug_logger.disentangling_log_info:
@@ -48,10 +54,10 @@ def disentangle_CG(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogge
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[2])
     return iterate
 
-def disentangle_approx_CG(theta, chi, renyi_alpha=0.5, N_iters_svd=5, eps_svd=1e-5, N_iters_svd_initial=5, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_approx_CG(theta, chi, renyi_alpha=0.5, N_iters_svd=5, eps_svd=1e-5, N_iters_svd_initial=5, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi-entropy, using Conjugate Gradients 
-    with an approximate cost function. The disentangling unitary is initialized with identity.
+    with an approximate cost function. The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -71,6 +77,12 @@ def disentangle_approx_CG(theta, chi, renyi_alpha=0.5, N_iters_svd=5, eps_svd=1e
     N_iters_svd_initial : int or None, optional
         number of iterations the qr splitting algorithm is run for the initial iterate.
         Generally should be equal or larger than N_iters_svd. Default: 5.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -82,14 +94,19 @@ def disentangle_approx_CG(theta, chi, renyi_alpha=0.5, N_iters_svd=5, eps_svd=1e
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
+    # Warm-start the qr splitting algorithm from the previous iterate. The singular values of the approximate split
+    # are bounded from above by the exact ones. For renyi_alpha > 1 the approximate cost is thus an upper bound that gets
+    # tighter with the warm start. For renyi_alpha < 1 it is a lower bound instead, and the increasing accuracy of the
+    # warm-started splits would show up as an increase of the cost, stalling the line search.
+    warm_start = renyi_alpha > 1
     # Perform TRM optimization
-    construct_new_iterate = lambda U, old_iterate : renyiAlphaIterate.RenyiAlphaIterateCG(U, theta, renyi_alpha, chi_max=chi, N_iters_svd=N_iters_svd, eps_svd=eps_svd)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    construct_new_iterate = conjugate_gradients.IterateFactory(renyiAlphaIterate.RenyiAlphaIterateCG, theta, warm_start=warm_start, alpha=renyi_alpha, chi_max=chi, N_iters_svd=N_iters_svd, eps_svd=eps_svd)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     conjugateGradientsOptimizer = conjugate_gradients.ConjugateGradientsOptimizer(manifold=manifold, construct_iterate=construct_new_iterate, **kwargs)
-    iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(renyiAlphaIterate.RenyiAlphaIterateCG(U0, theta, chi_max=chi, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
+    iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(renyiAlphaIterate.RenyiAlphaIterateCG(U0, theta, renyi_alpha, chi_max=chi, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
     if debug_logger.disentangling_log_info:
         debug_logger.append_to_log_list(("disentangler_info", "N_iters"), n)
         debug_logger.append_to_log_list(("disentangler_info", "N_restarts_not_descent"), num_restarts_not_descent)
@@ -101,10 +118,10 @@ def disentangle_approx_CG(theta, chi, renyi_alpha=0.5, N_iters_svd=5, eps_svd=1e
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[2])
     return iterate
 
-def disentangle_TRM(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_TRM(theta, renyi_alpha=0.5, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi-entropy, using the Trust Region method.
-    The disentangling unitary is initialized with identity.
+    The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -112,6 +129,12 @@ def disentangle_TRM(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogg
         wavefunction tensor to be disentangled.
     renyi_alpha : float, optional
         renyi alpha. Default: 0.5.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -123,12 +146,12 @@ def disentangle_TRM(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogg
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
     # Perform TRM optimization
     construct_new_iterate = lambda U, _ : renyiAlphaIterate.RenyiAlphaIterateTRM(U, theta, renyi_alpha)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     trustRegionOptimizer = trust_region_method.TrustRegionOptimizer(manifold, construct_new_iterate, **kwargs)
     iterate, n, debug_info = trustRegionOptimizer.optimize(construct_new_iterate(U0, None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates, print_warnings=False)
     if debug_logger.disentangling_log_info:
@@ -141,10 +164,10 @@ def disentangle_TRM(theta, renyi_alpha=0.5, debug_logger=debug_logging.DebugLogg
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[3])
     return iterate
 
-def disentangle_approx_TRM(theta, chi, renyi_alpha=0.5, N_iters_svd=2, eps_svd=1e-5, N_iters_svd_initial=2, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_approx_TRM(theta, chi, renyi_alpha=0.5, N_iters_svd=2, eps_svd=1e-5, N_iters_svd_initial=2, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi-entropy, using the Trust Region method
-    with an approximate cost function. The disentangling unitary is initialized with identity.
+    with an approximate cost function. The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -164,6 +187,12 @@ def disentangle_approx_TRM(theta, chi, renyi_alpha=0.5, N_iters_svd=2, eps_svd=1
     N_iters_svd_initial : int or None, optional
         number of iterations the qr splitting algorithm is run for the initial iterate.
         Generally should be equal or larger than N_iters_svd. Default: 2.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -175,14 +204,14 @@ def disentangle_approx_TRM(theta, chi, renyi_alpha=0.5, N_iters_svd=2, eps_svd=1
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
     # Perform TRM optimization
     construct_new_iterate = lambda U, old_iterate : renyiAlphaIterate.RenyiAlphaIterateApproxTRM(U, theta, renyi_alpha, chi_max=chi, N_iters_svd=N_iters_svd, eps_svd=eps_svd, old_iterate=old_iterate)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     trustRegionOptimizer = trust_region_method.TrustRegionOptimizer(manifold, construct_new_iterate, **kwargs)
-    iterate, n, debug_info = trustRegionOptimizer.optimize(renyiAlphaIterate.RenyiAlphaIterateApproxTRM(U0, theta, chi_max=chi, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates, print_warnings=False)
+    iterate, n, debug_info = trustRegionOptimizer.optimize(renyiAlphaIterate.RenyiAlphaIterateApproxTRM(U0, theta, renyi_alpha, chi_max=chi, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates, print_warnings=False)
     if debug_logger.disentangling_log_info:
         debug_logger.append_to_log_list(("disentangler_info", "N_iters"), n)
     if debug_logger.disentangling_log_info_per_iteration:
@@ -193,7 +222,12 @@ def disentangle_approx_TRM(theta, chi, renyi_alpha=0.5, N_iters_svd=2, eps_svd=1
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[3])
     return iterate
 
-def disentangle(theta, renyi_alpha=2.0, method="power_iteration", debug_logger=debug_logging.DebugLogger(), **kwargs):
+# Dispatch tables mapping the method strings to the Riemannian optimization disentangling functions.
+# The power iteration method is handled separately in disentangle(), since it only works for renyi_alpha=2.
+_METHODS = {"trm": disentangle_TRM, "cg": disentangle_CG}
+_APPROX_METHODS = {"trm": disentangle_approx_TRM, "cg": disentangle_approx_CG}
+
+def disentangle(theta, renyi_alpha=2.0, method="power_iteration", U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi alpha entropy.
 
@@ -205,6 +239,9 @@ def disentangle(theta, renyi_alpha=2.0, method="power_iteration", debug_logger=d
         renyi alpha. Default: 0.5.
     method : str, one of {"power_iteration", "trm", "cg"}, optional
         method used to minimize the entropy.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary. For method="power_iteration", theta is multiplied with U0 before
+        the power iteration is started. If this is set to None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -219,13 +256,18 @@ def disentangle(theta, renyi_alpha=2.0, method="power_iteration", debug_logger=d
     if method == "power_iteration":
         if renyi_alpha!=2.0:
             raise NotImplementedError(f"disentangling method \"power_iteration\" only works for minimizing renyi-2 entropy, not for alpha={renyi_alpha}!")
-        return disentangle_renyi_2.disentangle(theta, debug_logger=debug_logger, **kwargs)
-    elif method == "trm":
-        return disentangle_TRM(theta, renyi_alpha=renyi_alpha, debug_logger=debug_logger, **kwargs)
-    elif method == "cg":    
-        return disentangle_CG(theta, renyi_alpha=renyi_alpha, debug_logger=debug_logger, **kwargs)
-    else:
-        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for renyi_alpha disentangling!")
+        if U0 is None:
+            return disentangle_renyi_2.disentangle(theta, debug_logger=debug_logger, **kwargs)
+        _, D1, D2, _ = theta.shape
+        U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
+        theta = np.tensordot(U0, theta, ([2, 3], [1, 2])).transpose(2, 0, 1, 3) # i j [i*] [j*]; l [i] [j] r -> i j l r -> l i j r { D^6 }
+        U = disentangle_renyi_2.disentangle(theta, debug_logger=debug_logger, **kwargs)
+        return np.dot(U.reshape(D1*D2, D1*D2), U0.reshape(D1*D2, D1*D2)).reshape(D1, D2, D1, D2)
+    try:
+        disentangle_method = _METHODS[method]
+    except KeyError:
+        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for renyi_alpha disentangling!") from None
+    return disentangle_method(theta, renyi_alpha=renyi_alpha, U0=U0, debug_logger=debug_logger, **kwargs)
 
 def disentangle_approx(theta, chi, renyi_alpha=2.0, method="trm", debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
@@ -253,9 +295,8 @@ def disentangle_approx(theta, chi, renyi_alpha=2.0, method="trm", debug_logger=d
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    if method == "trm":
-        return disentangle_approx_TRM(theta, chi, renyi_alpha=renyi_alpha, debug_logger=debug_logger, **kwargs)
-    elif method == "cg":    
-        return disentangle_approx_CG(theta, chi, renyi_alpha=renyi_alpha, debug_logger=debug_logger, **kwargs)
-    else:
-        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for approximate renyi alpha disentangling!")
\ No newline at end of file
+    try:
+        disentangle_method = _APPROX_METHODS[method]
+    except KeyError:
+        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for approximate renyi alpha disentangling!") from None
+    return disentangle_method(theta, chi, renyi_alpha=renyi_alpha, debug_logger=debug_logger, **kwargs)
\ No newline at end of file
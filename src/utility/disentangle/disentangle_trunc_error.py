@@ -6,10 +6,10 @@ from ..riemannian_optimization import stiefel_manifold
 from . import truncErrorIterate
 from .. import debug_logging
 
-def disentangle_CG(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_CG(theta, chi, svd_backend="numpy", retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the truncation error, using Conjugate Gradients.
-    The disentangling unitary is initialized with identity.
+    The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -17,6 +17,15 @@ def disentangle_CG(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwarg
         wavefunction tensor to be disentangled.
     chi : int
         truncated bond dimension used for the computation of the cost function
+    svd_backend : str, one of {"numpy", "cupy"}, optional
+        backend used for the truncated SVD of U@theta. With "cupy", SVDs of large matrices are done on the GPU,
+        see utility.truncated_svd(). Requires the optional dependency cupy. Default: "numpy".
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -28,12 +37,14 @@ def disentangle_CG(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwarg
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
+    # The iterates rely on theta being contiguous, such that reshaping it does not copy
+    theta = np.ascontiguousarray(theta)
     # Perform TRM optimization
-    construct_new_iterate = lambda U, _ : truncErrorIterate.TruncErrorIterateCG(U, theta, chi, chi_max=None, N_iters_svd=None, eps_svd=0, old_iterate=None)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    construct_new_iterate = conjugate_gradients.IterateFactory(truncErrorIterate.TruncErrorIterateCG, theta, chi=chi, svd_backend=svd_backend)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     conjugateGradientsOptimizer = conjugate_gradients.ConjugateGradientsOptimizer(manifold=manifold, construct_iterate=construct_new_iterate, **kwargs)
     iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(construct_new_iterate(U0, None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
     if debug_logger.disentangling_log_info:
@@ -47,10 +58,10 @@ def disentangle_CG(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwarg
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[2])
     return iterate
 
-def disentangle_approx_CG(theta, chi, N_iters_svd=5, eps_svd=0.0, N_iters_svd_initial=50, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_approx_CG(theta, chi, N_iters_svd=5, eps_svd=0.0, N_iters_svd_initial=50, dtype_internal=None, step_size_svd=None, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the truncation error, using Conjugate Gradients 
-    with an approximate cost function. The disentangling unitary is initialized with identity.
+    with an approximate cost function. The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -59,7 +70,8 @@ def disentangle_approx_CG(theta, chi, N_iters_svd=5, eps_svd=0.0, N_iters_svd_in
     chi : int
         truncated bond dimension used for the computation of the cost function
     N_iters_svd : int or None, optional
-        number of iterations the qr splitting algorithm is run for approximating the SVD.
+        number of iterations the qr splitting algorithm is run for approximating the SVD. After the initial iterate,
+        this is the number of projector-splitting sweeps warm-started from the previous iterate.
         If this is set to None, a full SVD is performed instead. Default: 5.
     eps_svd : float, optional 
         eps parameter passed into split_matrix_iterate_QR(), 
@@ -67,6 +79,18 @@ def disentangle_approx_CG(theta, chi, N_iters_svd=5, eps_svd=0.0, N_iters_svd_in
     N_iters_svd_initial : int or None, optional
         number of iterations the qr splitting algorithm is run for the initial iterate.
         Generally should be equal or larger than N_iters_svd. Default: 5.
+    dtype_internal : np.dtype or None, optional
+        if this is set (e.g. to np.complex64), the iterations of the approximate SVD are done in this lower precision
+        dtype, followed by a single sweep in full precision. See truncErrorIterate.TruncErrorIterate. Default: None.
+    step_size_svd : float or None, optional
+        if this is set, iterates that are further than step_size_svd away from the previous iterate get proportionally
+        fewer than N_iters_svd sweeps of the approximate SVD. See truncErrorIterate.TruncErrorIterate. Default: None.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -78,14 +102,16 @@ def disentangle_approx_CG(theta, chi, N_iters_svd=5, eps_svd=0.0, N_iters_svd_in
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
+    # The iterates rely on theta being contiguous, such that reshaping it does not copy
+    theta = np.ascontiguousarray(theta)
     # Perform TRM optimization
-    construct_new_iterate = lambda U, old_iterate : truncErrorIterate.TruncErrorIterateCG(U, theta, chi, chi_max=None, N_iters_svd=N_iters_svd, eps_svd=eps_svd)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    construct_new_iterate = conjugate_gradients.IterateFactory(truncErrorIterate.TruncErrorIterateCG, theta, chi=chi, N_iters_svd=N_iters_svd, eps_svd=eps_svd, dtype_internal=dtype_internal, step_size_svd=step_size_svd)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     conjugateGradientsOptimizer = conjugate_gradients.ConjugateGradientsOptimizer(manifold=manifold, construct_iterate=construct_new_iterate, **kwargs)
-    iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(truncErrorIterate.TruncErrorIterateCG(U0, theta, chi, chi_max=None, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
+    iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(truncErrorIterate.TruncErrorIterateCG(U0, theta, chi, chi_max=None, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None, dtype_internal=dtype_internal), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
     if debug_logger.disentangling_log_info:
         debug_logger.append_to_log_list(("disentangler_info", "N_iters"), n)
         debug_logger.append_to_log_list(("disentangler_info", "N_restarts_not_descent"), num_restarts_not_descent)
@@ -97,10 +123,10 @@ def disentangle_approx_CG(theta, chi, N_iters_svd=5, eps_svd=0.0, N_iters_svd_in
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[2])
     return iterate
 
-def disentangle_TRM(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_TRM(theta, chi, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi-entropy, using the Trust Region method.
-    The disentangling unitary is initialized with identity.
+    The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -108,6 +134,12 @@ def disentangle_TRM(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwar
         wavefunction tensor to be disentangled.
     chi : int
         truncated bond dimension used for the computation of the cost function
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -119,12 +151,14 @@ def disentangle_TRM(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwar
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
+    # The iterates rely on theta being contiguous, such that reshaping it does not copy
+    theta = np.ascontiguousarray(theta)
     # Perform TRM optimization
-    construct_new_iterate = lambda U, _ : truncErrorIterate.TruncErrorIterateTRM(U, theta, chi)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    construct_new_iterate = lambda U, old_iterate : truncErrorIterate.TruncErrorIterateTRM(U, theta, chi, old_iterate=old_iterate)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     trustRegionOptimizer = trust_region_method.TrustRegionOptimizer(manifold, construct_new_iterate, **kwargs)
     iterate, n, debug_info = trustRegionOptimizer.optimize(construct_new_iterate(U0, None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates, print_warnings=False)
     if debug_logger.disentangling_log_info:
@@ -137,10 +171,10 @@ def disentangle_TRM(theta, chi, debug_logger=debug_logging.DebugLogger(), **kwar
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[3])
     return iterate
 
-def disentangle_approx_TRM(theta, chi, chi_max=None, N_iters_svd=2, eps_svd=0.0, N_iters_svd_initial=50, debug_logger=debug_logging.DebugLogger(), **kwargs):
+def disentangle_approx_TRM(theta, chi, chi_max=None, N_iters_svd=2, eps_svd=0.0, N_iters_svd_initial=50, dtype_internal=None, step_size_svd=None, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the renyi-entropy, using the Trust Region method
-    with an approximate cost function. The disentangling unitary is initialized with identity.
+    with an approximate cost function. The disentangling unitary is initialized with identity, unless U0 is given.
 
     Parameters
     ----------
@@ -155,7 +189,8 @@ def disentangle_approx_TRM(theta, chi, chi_max=None, N_iters_svd=2, eps_svd=0.0,
     renyi_alpha : float, optional
         renyi alpha. Default: 0.5.
     N_iters_svd : int or None, optional
-        number of iterations the qr splitting algorithm is run for approximating the SVD.
+        number of iterations the qr splitting algorithm is run for approximating the SVD. After the initial iterate,
+        this is the number of projector-splitting sweeps warm-started from the previous iterate.
         If this is set to None, a full SVD is performed instead. Default: 2.
     eps_svd : float, optional 
         eps parameter passed into split_matrix_iterate_QR(), 
@@ -163,6 +198,18 @@ def disentangle_approx_TRM(theta, chi, chi_max=None, N_iters_svd=2, eps_svd=0.0,
     N_iters_svd_initial : int or None, optional
         number of iterations the qr splitting algorithm is run for the initial iterate.
         Generally should be equal or larger than N_iters_svd. Default: 2.
+    dtype_internal : np.dtype or None, optional
+        if this is set (e.g. to np.complex64), the iterations of the approximate SVD are done in this lower precision
+        dtype, followed by a single sweep in full precision. See truncErrorIterate.TruncErrorIterate. Default: None.
+    step_size_svd : float or None, optional
+        if this is set, iterates that are further than step_size_svd away from the previous iterate get proportionally
+        fewer than N_iters_svd sweeps of the approximate SVD. See truncErrorIterate.TruncErrorIterate. Default: None.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitary is optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (i, j, i*, j*) or None, optional
+        initial disentangling unitary, e.g. the result for a nearby theta. If this is None, the identity is used. Default: None.
     debug_logger : DebugLogger instance, optional
         DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
     **kwargs
@@ -176,14 +223,16 @@ def disentangle_approx_TRM(theta, chi, chi_max=None, N_iters_svd=2, eps_svd=0.0,
     """
     if chi_max is None:
         chi_max = chi
-    # Initialize disentangling unitary with identity
+    # Initialize disentangling unitary with identity, if no initial unitary is given
     _, D1, D2, _ = theta.shape
-    U0 = np.reshape(np.eye(D1*D2).astype(np.complex128), (D1, D2, D1, D2))
+    U0 = stiefel_manifold.initial_unitary(U0, D1, D2)
+    # The iterates rely on theta being contiguous, such that reshaping it does not copy
+    theta = np.ascontiguousarray(theta)
     # Perform TRM optimization
-    construct_new_iterate = lambda U, old_iterate : truncErrorIterate.TruncErrorIterateApproxTRM(U, theta, chi, chi_max=chi_max, N_iters_svd=N_iters_svd, eps_svd=eps_svd, old_iterate=old_iterate)
-    manifold = stiefel_manifold.ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=U0.shape)
+    construct_new_iterate = lambda U, old_iterate : truncErrorIterate.TruncErrorIterateApproxTRM(U, theta, chi, chi_max=chi_max, N_iters_svd=N_iters_svd, eps_svd=eps_svd, old_iterate=old_iterate, dtype_internal=dtype_internal, step_size_svd=step_size_svd)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
     trustRegionOptimizer = trust_region_method.TrustRegionOptimizer(manifold, construct_new_iterate, **kwargs)
-    iterate, n, debug_info = trustRegionOptimizer.optimize(truncErrorIterate.TruncErrorIterateApproxTRM(U0, theta, chi, chi_max=chi_max, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates, print_warnings=False)
+    iterate, n, debug_info = trustRegionOptimizer.optimize(truncErrorIterate.TruncErrorIterateApproxTRM(U0, theta, chi, chi_max=chi_max, N_iters_svd=N_iters_svd_initial, eps_svd=eps_svd, old_iterate=None, dtype_internal=dtype_internal), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates, print_warnings=False)
     if debug_logger.disentangling_log_info:
         debug_logger.append_to_log_list(("disentangler_info", "N_iters"), n)
     if debug_logger.disentangling_log_info_per_iteration:
@@ -194,6 +243,76 @@ def disentangle_approx_TRM(theta, chi, chi_max=None, N_iters_svd=2, eps_svd=0.0,
         debug_logger.append_to_log_list(("disentangler_info", "iterates"), debug_info[3])
     return iterate
 
+def disentangle_batch(theta_batch, chi, N_iters_svd=None, eps_svd=0.0, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10, U0=None, debug_logger=debug_logging.DebugLogger(), **kwargs):
+    """
+    Disentangles a batch of B wavefunctions of the same shape by minimizing the truncation error, using Conjugate Gradients.
+    All problems are optimized simultaneously with a single batched CG driver, with stacked linear algebra over the leading
+    batch axis. This amortizes the python overhead, which dominates for small bond dimensions, over the whole batch.
+    The disentangling unitaries are initialized with identity, unless U0 is given.
+
+    Parameters
+    ----------
+    theta_batch : np.ndarray of shape (B, l, i, j, r)
+        batch of wavefunction tensors to be disentangled.
+    chi : int
+        truncated bond dimension used for the computation of the cost function
+    N_iters_svd : int or None, optional
+        number of projector-splitting sweeps warm-started from the previous iterate, used for approximating the SVD.
+        If this is set to None, a full SVD is performed instead. The initial iterate always uses a full SVD. Default: None.
+    eps_svd : float, optional
+        if the relative decrease of the truncation error after one sweep is smaller than eps_svd for all problems,
+        the sweeps are terminated early. Default: 0.0.
+    retraction : str, one of {"qr", "newton_schulz"}, optional
+        retraction of the complex stiefel manifold the unitaries are optimized on. Default: "qr".
+    N_iters_newton_schulz, tol_newton_schulz : int, float, optional
+        parameters of the "newton_schulz" retraction, see stiefel_manifold.ComplexStiefelManifold. Default: 3, 1e-10.
+    U0 : np.ndarray of shape (B, i, j, i*, j*) or None, optional
+        initial disentangling unitaries, e.g. the results of disentangling nearby wavefunction tensors.
+        If this is set to None, all unitaries are initialized with identity. Default: None.
+    debug_logger : DebugLogger instance, optional
+        DebugLogger instance managing debug logging. See 'src/utility/debug_logging.py' for more details.
+        Information is logged separately for each problem of the batch.
+    **kwargs
+        remaining kwargs are passed into the initialization of conjugate_gradients.ConjugateGradientsOptimizerBatched()
+        see src/utility/riemannian_optimization/conjugate_gradients.py for more information.
+
+    Returns
+    -------
+    U_final : np.ndarray of shape (B, i, j, i*, j*)
+        final disentangling unitaries after optimization
+    """
+    # Initialize disentangling unitaries
+    B, _, D1, D2, _ = theta_batch.shape
+    if U0 is None:
+        U0 = np.broadcast_to(stiefel_manifold.identity_unitary(D1, D2), (B, D1, D2, D1, D2))
+    elif U0.shape != (B, D1, D2, D1, D2):
+        raise ValueError(f"U0 must be of shape {(B, D1, D2, D1, D2)}, but is of shape {U0.shape}")
+    else:
+        U0 = np.asarray(U0, dtype=np.complex128)
+    # The iterates rely on theta being contiguous, such that reshaping it does not copy
+    theta_batch = np.ascontiguousarray(theta_batch)
+    # Perform CG optimization. The optimizer compacts the batch to the problems that have not yet converged,
+    # so theta is taken from the old iterate.
+    construct_new_iterate = lambda U, old_iterate : truncErrorIterate.TruncErrorIterateCGBatched(U, theta_batch if old_iterate is None else old_iterate.theta, chi, N_iters_svd=N_iters_svd, eps_svd=eps_svd, old_iterate=old_iterate)
+    manifold = stiefel_manifold.unitary_manifold(D1, D2, batched=True, retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
+    conjugateGradientsOptimizer = conjugate_gradients.ConjugateGradientsOptimizerBatched(manifold=manifold, construct_iterate=construct_new_iterate, **kwargs)
+    iterate, n, num_restarts_not_descent, num_restarts_powell, debug_info = conjugateGradientsOptimizer.optimize(construct_new_iterate(U0, None), log_debug_info=debug_logger.disentangling_log_info_per_iteration, log_iterates=debug_logger.disentangling_log_iterates)
+    for b in range(B):
+        if debug_logger.disentangling_log_info:
+            debug_logger.append_to_log_list(("disentangler_info", "N_iters"), n[b])
+            debug_logger.append_to_log_list(("disentangler_info", "N_restarts_not_descent"), num_restarts_not_descent[b])
+            debug_logger.append_to_log_list(("disentangler_info", "N_restarts_powell"), num_restarts_powell[b])
+        if debug_logger.disentangling_log_info_per_iteration:
+            debug_logger.append_to_log_list(("disentangler_info", "costs"), [cost[b] for cost in debug_info[0][:n[b]+1]])
+            debug_logger.append_to_log_list(("disentangler_info", "step_sizes"), [step_size[b] for step_size in debug_info[1][:n[b]]])
+        if debug_logger.disentangling_log_iterates:
+            debug_logger.append_to_log_list(("disentangler_info", "iterates"), [U[b] for U in debug_info[2][:n[b]+1]])
+    return iterate
+
+# Dispatch tables mapping the method strings to the disentangling functions
+_METHODS = {"trm": disentangle_TRM, "cg": disentangle_CG}
+_APPROX_METHODS = {"trm": disentangle_approx_TRM, "cg": disentangle_approx_CG}
+
 def disentangle(theta, chi, method="trm", debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
     Disentangles the given wavefunction theta by minimizing the truncation error.
@@ -217,12 +336,11 @@ def disentangle(theta, chi, method="trm", debug_logger=debug_logging.DebugLogger
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    if method == "trm":
-        return disentangle_TRM(theta, chi=chi, debug_logger=debug_logger, **kwargs)
-    elif method == "cg":    
-        return disentangle_CG(theta, chi=chi, debug_logger=debug_logger, **kwargs)
-    else:
-        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for truncation error disentangling!")
+    try:
+        disentangle_method = _METHODS[method]
+    except KeyError:
+        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for truncation error disentangling!") from None
+    return disentangle_method(theta, chi=chi, debug_logger=debug_logger, **kwargs)
 
 def disentangle_approx(theta, chi, method="cg", debug_logger=debug_logging.DebugLogger(), **kwargs):
     """
@@ -243,14 +361,13 @@ def disentangle_approx(theta, chi, method="cg", debug_logger=debug_logging.Debug
         remaining kwargs are passed into the respective method chosen with method.
         See the different called functions for more information.
 
-    RReturns
+    Returns
     -------
     U_final : np.ndarray of shape (i, j, i*, j*)
         final disentangling unitary after optimization
     """
-    if method == "trm":
-        return disentangle_approx_TRM(theta, chi, debug_logger=debug_logger, **kwargs)
-    elif method == "cg":    
-        return disentangle_approx_CG(theta, chi, debug_logger=debug_logger, **kwargs)
-    else:
-        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for approximate truncation error disentangling!")
\ No newline at end of file
+    try:
+        disentangle_method = _APPROX_METHODS[method]
+    except KeyError:
+        raise NotImplementedError(f"disentangling method \"{method}\" is not implemented for approximate truncation error disentangling!") from None
+    return disentangle_method(theta, chi, debug_logger=debug_logger, **kwargs)
\ No newline at end of file
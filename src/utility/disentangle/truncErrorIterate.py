@@ -1,4 +1,5 @@
 import numpy as np
+import math
 from .. import utility
 
 """
@@ -13,7 +14,7 @@ class TruncErrorIterate:
     Base class for the more specialized iterate classes.
     """
 
-    def __init__(self, U, theta, chi, chi_max=None, N_iters_svd=None, eps_svd=0.0, old_iterate=None):
+    def __init__(self, U, theta, chi, chi_max=None, N_iters_svd=None, eps_svd=0.0, old_iterate=None, dtype_internal=None, svd_backend="numpy", step_size_svd=None):
         """
         Initializes new iterate.
 
@@ -38,8 +39,24 @@ class TruncErrorIterate:
             eps parameter passed into split_matrix_iterate_QR(), 
             see src/utility/utility.py for more information. Default: 0.0.
         old_iterate : element of TruncErrorIterate class or None, optional
-            old iterate. This is used here for initializing the qr splitting algorithm with the
-            old result, which can lead to faster convergence. Default: None.
+            old iterate. If the old iterate carries the right isometry V of its approximate SVD, the
+            approximate SVD of this iterate is computed with projector-splitting sweeps starting from V,
+            instead of running the qr splitting algorithm from scratch. The matricized conjugate of theta
+            is also taken from the old iterate, if both iterates share the same theta. Default: None.
+        dtype_internal : np.dtype or None, optional
+            if this is not None (e.g. np.complex64), the iterations of the approximate SVD are done in this lower
+            precision dtype, followed by a single sweep in the precision of theta. This sweep restores the isometries
+            X and V to full precision, such that the cost function and the gradient stay accurate. Only used if
+            N_iters_svd is not None. Default: None.
+        svd_backend : str, one of {"numpy", "cupy"}, optional
+            backend passed into utility.truncated_svd() for the truncated SVD of Utheta. Only used by
+            TruncErrorIterateCG if N_iters_svd is None. Default: "numpy".
+        step_size_svd : float or None, optional
+            if this is not None, the number of projector-splitting sweeps warm-started from old_iterate is adapted
+            to the step ||U - U_old||_F between the two iterates: steps larger than step_size_svd get proportionally
+            fewer sweeps, max(1, int(N_iters_svd * step_size_svd / ||U - U_old||_F)). Large steps happen early in the
+            optimization, where a coarse approximation of the SVD suffices, while close to convergence the full
+            N_iters_svd sweeps are done. If this is set to None, N_iters_svd sweeps are always done. Default: None.
         """
         self.U = U
         self.theta = theta
@@ -47,13 +64,171 @@ class TruncErrorIterate:
         self.chi_max = chi_max
         self.N_iters_svd = N_iters_svd
         self.eps_svd = eps_svd
+        self.dtype_internal = dtype_internal
+        self.svd_backend = svd_backend
         self.l, self.D1, self.D2, self.r = self.theta.shape
         self.k = min(self.l*self.D1, self.D2*self.r)
         if self.chi_max is not None:
             self.k = min(self.k, self.chi_max)
-        self.Y0 = None
+        self.V0 = None
         if self.N_iters_svd is not None and old_iterate is not None:
-            self.Y0 = old_iterate.Y0
+            self.V0 = old_iterate.V0
+            if step_size_svd is not None and self.V0 is not None:
+                step = np.linalg.norm(U - old_iterate.U) # { D^4 }
+                if step > step_size_svd:
+                    self.N_iters_svd = max(1, int(self.N_iters_svd * step_size_svd / step))
+        # conj(theta) in the matrix layout (i j), (l r), computed on first use and shared between iterates
+        self.theta_mat_conj = None
+        # Output buffer of U@theta, allocated on first use and shared between iterates, see _contract_U_theta()
+        self._utheta = None
+        if old_iterate is not None and old_iterate.theta is theta:
+            self.theta_mat_conj = old_iterate.theta_mat_conj
+            self._utheta = old_iterate._utheta
+
+    def _split_projector_splitting(self, Utheta, V):
+        """
+        Approximates the rank-k SVD of Utheta with self.N_iters_svd projector-splitting sweeps, starting from
+        the right isometry V of a previous iterate. Each sweep only consists of two thin QR decompositions:
+
+            X, _ = qr(Utheta @ V),    V, R = qr(conj(Utheta.T) @ X),    Utheta ~ X @ conj(R.T) @ conj(V.T).
+
+        Since Utheta is normalized, the squared truncation error of the split is given by 1 - ||R||^2,
+        which is used for the early termination criterion with self.eps_svd. If self.dtype_internal is set,
+        all but the last sweep are done in that dtype, without early termination.
+
+        Parameters
+        ----------
+        Utheta : np.ndarray of shape (l*i, j*r)
+            normalized matrix that is to be split.
+        V : np.ndarray of shape (j*r, k)
+            right isometry of the previous iterate.
+
+        Returns
+        -------
+        X : np.ndarray of shape (l*i, k)
+            left isometry.
+        C : np.ndarray of shape (k, k)
+            core matrix, Utheta ~ X @ C @ conj(V.T).
+        V : np.ndarray of shape (j*r, k)
+            right isometry.
+        """
+        N_sweeps = self.N_iters_svd
+        if self.dtype_internal is not None and N_sweeps > 1:
+            Utheta_internal = Utheta.astype(self.dtype_internal)
+            V = V.astype(self.dtype_internal)
+            for _ in range(N_sweeps - 1):
+                X, _ = np.linalg.qr(Utheta_internal@V) # { D^7 }
+                V, _ = np.linalg.qr(np.conj(Utheta_internal.T)@X) # { D^7 }
+            V = V.astype(Utheta.dtype)
+            N_sweeps = 1
+        error = None
+        for _ in range(N_sweeps):
+            X, _ = np.linalg.qr(Utheta@V) # { D^7 }
+            V, R = np.linalg.qr(np.conj(Utheta.T)@X) # { D^7 }
+            error_new = math.sqrt(max(1 - np.linalg.norm(R)**2, 0.0))
+            # Scalar comparisons, equivalent to np.isclose(error_new, 0) but without its overhead
+            if error is not None and (error_new <= 1e-8 or abs((error - error_new)/error) < self.eps_svd):
+                break
+            error = error_new
+        return X, np.conj(R.T), V
+
+    def _split_matrix_iterate_QR(self, Utheta, chi):
+        """
+        Splits Utheta into an isometry X and a matrix Y using split_matrix_iterate_QR() with self.N_iters_svd
+        iterations, see src/utility/utility.py. If self.dtype_internal is set, the iterations are done in that
+        dtype, and a single sweep in the precision of Utheta is added.
+
+        Parameters
+        ----------
+        Utheta : np.ndarray of shape (l*i, j*r)
+            normalized matrix that is to be split.
+        chi : int
+            split dimension.
+
+        Returns
+        -------
+        X : np.ndarray of shape (l*i, chi)
+            left isometry.
+        Y : np.ndarray of shape (chi, j*r)
+            Y = conj(X.T)@Utheta.
+        """
+        if self.dtype_internal is None or chi >= min(Utheta.shape):
+            X, Y, _, _ = utility.split_matrix_iterate_QR(Utheta, chi, self.N_iters_svd, self.eps_svd, normalize=False) # { N_iters_svd * D^7 }
+            return X, Y
+        X, _, _, _ = utility.split_matrix_iterate_QR(Utheta.astype(self.dtype_internal), chi, self.N_iters_svd, self.eps_svd, normalize=False) # { N_iters_svd * D^7 }
+        V, _ = np.linalg.qr(np.conj(Utheta.T)@X.astype(Utheta.dtype)) # { D^7 }
+        X, _ = np.linalg.qr(Utheta@V) # { D^7 }
+        return X, np.conj(X.T)@Utheta
+
+    def _contract_U_theta(self, U, use_buffer=False):
+        """
+        Computes U@theta, directly in the matrix layout (l, i), (j, r) that is needed for the SVD.
+        Since theta is stored as (l, i, j, r), this is a single matrix product of U with the l stacked (i*j, r)
+        slices of theta, and the result already has the memory layout l, i, j, r. No transposed copies are made.
+
+        Parameters
+        ----------
+        U : np.ndarray of shape (i, j, i*, j*)
+            disentangling unitary, or a tangent vector.
+        use_buffer : bool, optional
+            if this is set to True, the result is written into a buffer that is shared by all iterates of the same
+            theta, instead of allocating a new array. The result is then only valid until the next call with
+            use_buffer=True and must not be stored on the iterate. Default: False.
+
+        Returns
+        -------
+        Utheta : np.ndarray of shape (l*i, j*r)
+            contraction of U and theta.
+        """
+        n = self.D1*self.D2
+        out = None
+        if use_buffer:
+            dtype = np.result_type(U, self.theta)
+            if self._utheta is None or self._utheta.dtype != dtype:
+                self._utheta = np.empty((self.l, n, self.r), dtype=dtype)
+            out = self._utheta
+        return np.matmul(U.reshape(n, n), self.theta.reshape(self.l, n, self.r), out=out).reshape(self.l*self.D1, self.D2*self.r) # i j [i*] [j*]; l [i] [j] r -> l i j r { D^8 }
+
+    def _contract_theta_conj(self, A):
+        """
+        Contracts the matrix A of shape (l*i, j*r) with theta* over the l and r legs. Both tensors are brought into
+        the layout (i j), (l r), such that the contraction is a single matrix product. For theta* this is done only
+        once and the result is shared with all following iterates (see __init__()).
+
+        Parameters
+        ----------
+        A : np.ndarray of shape (l*i, j*r)
+            matrix to be contracted with theta*, e.g. the truncated Utheta.
+
+        Returns
+        -------
+        result : np.ndarray of shape (i*j, i*j)
+            contraction of A and theta*.
+        """
+        n = self.D1*self.D2
+        if self.theta_mat_conj is None:
+            self.theta_mat_conj = np.ascontiguousarray(np.conj(self.theta.reshape(self.l, n, self.r)).transpose(1, 0, 2)).reshape(n, self.l*self.r) # l*, (i j)*, r* -> (i j)*, (l r)*
+        A = np.ascontiguousarray(A.reshape(self.l, n, self.r).transpose(1, 0, 2)).reshape(n, self.l*self.r) # l, (i j), r -> (i j), (l r)
+        return A@self.theta_mat_conj.T # (i j) [(l r)]; [(l r)*] (i j)* -> (i j) (i j)* { D^8 }
+
+    def _contract_conj_sandwich(self, V, M, W):
+        """
+        Computes V@conj(M.T)@W, with all three tensors interpreted as (i*j, i*j) matrices. This is the matrix form of the
+        contraction of M* with V over the legs (k, l) followed by the contraction with W over the legs (i, j), that appears
+        in the riemannian gradient and hessian of the truncation error.
+
+        Parameters
+        ----------
+        V, M, W : np.ndarray of shape (i, j, i*, j*) or (i*j, i*j)
+            tensors to be contracted.
+
+        Returns
+        -------
+        result : np.ndarray of shape (i, j, i*, j*)
+            the result V@conj(M.T)@W.
+        """
+        n = self.D1*self.D2
+        return (V.reshape(n, n)@np.conj(M.reshape(n, n).T)@W.reshape(n, n)).reshape(self.D1, self.D2, self.D1, self.D2) # { D^6 }
 
     def get_iterate(self):
         """
@@ -85,23 +260,25 @@ class TruncErrorIterateCG(TruncErrorIterate):
             self.cost = 0.0
             return self.cost
         # Compute Utheta
-        Utheta = np.dot(np.ascontiguousarray(self.U).reshape((self.D1*self.D2, -1)), np.ascontiguousarray(self.theta.transpose(1, 2, 0, 3)).reshape(self.D1*self.D2, -1)) # l, i, j, r -> i, j, l, r -> (i, j), (l, r)
-        Utheta = np.ascontiguousarray(np.ascontiguousarray(Utheta).reshape((self.D1, self.D2, self.l, self.r)).transpose((2, 0, 1, 3))).reshape((self.l*self.D1, -1)) # (i, j), (l, r) -> i, j, l, r -> l, i, j, r -> (l, i), (j, r)
+        Utheta = self._contract_U_theta(self.U, use_buffer=True)
         # Renormalize (might not be normalized due to numerical errors)
         Utheta /= np.linalg.norm(Utheta)
-        # Perform SVD
+        # Perform SVD. The truncated Utheta is stored as X@C@Y, where C is not necessarily diagonal.
         if self.N_iters_svd is None:
-            self.X, self.S, self.Y = utility.safe_svd(Utheta, full_matrices=False) # { D^9 }
-            idx = np.argsort(self.S)[::-1][:self.chi]
-            self.X, self.S, self.Y = self.X[:, idx], self.S[idx], self.Y[idx, :]
-        else:
-            self.X, self.Y, _, _ = utility.split_matrix_iterate_QR(Utheta, self.chi, self.N_iters_svd, self.eps_svd, C0=self.Y0, normalize=False) # { N_iters_svd * D^7 }
-            self.Y0 = self.Y
-            XX, self.S, self.Y = np.linalg.svd(self.Y, full_matrices=False) # { D^5 }
+            self.X, S, self.Y = utility.truncated_svd(Utheta, self.chi, backend=self.svd_backend) # { D^9 }
+            self.C = np.diag(S)
+        elif self.V0 is None:
+            self.X, self.Y = self._split_matrix_iterate_QR(Utheta, self.chi) # { N_iters_svd * D^7 }
+            XX, S, self.Y = np.linalg.svd(self.Y, full_matrices=False) # { D^5 }
             self.X = self.X@XX
+            self.C = np.diag(S)
+            self.V0 = np.conj(self.Y.T)
+        else:
+            self.X, self.C, self.V0 = self._split_projector_splitting(Utheta, self.V0) # { N_iters_svd * D^7 }
+            self.Y = np.conj(self.V0.T)
         # Compute cost function.
-        # 1 - np.sum(self.S**2) should be larger than zero, but can be lower than zero due to numerical errors.
-        self.cost = np.sqrt(max(1 - np.sum(self.S**2), 0.0))
+        # 1 - ||C||^2 should be larger than zero, but can be lower than zero due to numerical errors.
+        self.cost = math.sqrt(max(1 - np.linalg.norm(self.C)**2, 0.0))
         return self.cost
 
     def compute_gradient(self):
@@ -115,11 +292,7 @@ class TruncErrorIterateCG(TruncErrorIterate):
         """
         if self.cost <= 1e-14:
             return np.zeros(self.U.shape, dtype=self.U.dtype) 
-        grad = np.ascontiguousarray(self.X@np.diag(self.S)@self.Y) # -> (l, i), (j, r)
-        grad = np.reshape(grad, (self.l, self.D1, self.D2, self.r))
-        grad = np.ascontiguousarray(grad.transpose((0, 3, 1, 2))).reshape(self.l*self.r, self.D1*self.D2) # l, i, j, r -> l, r, i, j -> (l, r), (i, j)
-        theta = np.ascontiguousarray(self.theta.transpose((0, 3, 1, 2))).reshape(self.l*self.r, self.D1*self.D2) # l, i, j, r -> l, r, i, j -> (l, r), (i, j)
-        grad = np.dot(grad.T, np.conj(theta)) # (i j) [(l r)]; [(l r)*] (i j)* -> (i j) (i j)*
+        grad = self._contract_theta_conj(self.X@self.C@self.Y)
         grad = -grad/self.cost
         U = self.U.reshape(self.D1*self.D2, self.D1*self.D2)
         return (grad - 0.5 * U@(U.conj().T@grad + grad.conj().T@U)).reshape(self.D1, self.D2, self.D1, self.D2)
@@ -131,7 +304,7 @@ class TruncErrorIterateTRM(TruncErrorIterate):
     This is especially useful when multiple hessian vector products must be computed.
     """
 
-    def __init__(self, U, theta, chi):
+    def __init__(self, U, theta, chi, old_iterate=None):
         """
         Initializes new iterate.
 
@@ -139,7 +312,7 @@ class TruncErrorIterateTRM(TruncErrorIterate):
         ----------
         See class TruncErrorIterate.
         """
-        TruncErrorIterate.__init__(self, U, theta, chi, chi_max=None, N_iters_svd=None, eps_svd=0, old_iterate=None)
+        TruncErrorIterate.__init__(self, U, theta, chi, chi_max=None, N_iters_svd=None, eps_svd=0, old_iterate=old_iterate)
         self.computed_gradient = False
         self.computed_hessian = False
 
@@ -153,13 +326,11 @@ class TruncErrorIterateTRM(TruncErrorIterate):
             value of the cost function
         """
         # Compute Utheta
-        Utheta = np.tensordot(self.U, self.theta, ([2, 3], [1, 2])) # i j [i*] [j*]; l [i] [j] r -> i j l r { D^8 }
-        Utheta = Utheta.transpose(2, 0, 1, 3) # i, j, l, r -> l, i, j, r
+        Utheta = self._contract_U_theta(self.U, use_buffer=True)
         # Renormalize (might not be normalized due to numerical errors)
         Utheta /= np.linalg.norm(Utheta)
         # Perform SVD
-        l, i, j, r = Utheta.shape
-        self.X, self.S, self.Y = utility.safe_svd(Utheta.reshape(l*i, j*r), full_matrices=False) # { D^9 }
+        self.X, self.S, self.Y = utility.safe_svd(Utheta, full_matrices=False) # { D^9 }
         self.Y = np.conj(self.Y.T)
         idx = np.argsort(self.S)[::-1]
         self.X, self.S, self.Y = self.X[:, idx], self.S[idx], self.Y[:, idx]
@@ -179,12 +350,8 @@ class TruncErrorIterateTRM(TruncErrorIterate):
             gradient of the cost function
         """
         if not self.computed_gradient:
-            Xtheta = np.tensordot(self.X_trunc.reshape(self.l, self.D1, -1), np.conj(self.theta), ([0], [0])) # [l] i chi; [l*] k* l* r* -> i chi k* l* r* { D^8 }
-            XStheta = np.tensordot(Xtheta, np.diag(self.S_trunc), ([1], [0])) # i [chi] k* l* r*; [chi] chi -> i k* l* r* chi { D^7 }
-            self.XSYtheta = np.tensordot(XStheta, np.conj(self.Y_trunc.reshape(self.D2, self.r, -1)), ([3, 4], [1, 2])) # i k* l* [r*] [chi]; j [r] [chi] -> i k* l* j  { D^7 }
-            self.XSYtheta = self.XSYtheta.transpose(0, 3, 1, 2) # i, k*, l*, j -> i, j, k*, l*
-            self.XSYthetaUU = np.tensordot(np.conj(self.XSYtheta), self.U, ([2, 3], [2, 3])) # i' j' [k'] [l']; i j [k'] [l'] -> i' j' i j { D^6 }
-            self.XSYthetaUU = np.tensordot(self.XSYthetaUU, self.U, ([0, 1], [0, 1])) # [i'] [j'] i j; [i'] [j'] k l -> i j k l { D^6 }
+            self.XSYtheta = self._contract_theta_conj((self.X_trunc*self.S_trunc)@np.conj(self.Y_trunc.T)).reshape(self.D1, self.D2, self.D1, self.D2) # { D^8 }
+            self.XSYthetaUU = self._contract_conj_sandwich(self.U, self.XSYtheta, self.U) # { D^6 }
             self.computed_gradient = True
         if self.cost == 0:
             # Avoid dividing by zero
@@ -227,35 +394,29 @@ class TruncErrorIterateTRM(TruncErrorIterate):
             self.S_inv[non_zero_indices] = 1 / self.S[non_zero_indices]
         # Compute dP and dD
         l, D1, D2, r = self.theta.shape
-        dUtheta = np.tensordot(dU, self.theta, ([2, 3], [1, 2])) # i j [i*] [j*]; l [i] [j] r -> i j l r { D^8 }
-        dUtheta = dUtheta.transpose(2, 0, 1, 3).reshape(l*D1, D2*r) # i, j, l, r -> l, i, j, r
-        dP = np.conj(self.X.T)@dUtheta@self.Y
+        dUtheta = self._contract_U_theta(dU)
+        dUthetaY = dUtheta@self.Y
+        dUthetaX = np.conj(dUtheta.T)@self.X
+        dP = np.conj(self.X.T)@dUthetaY
         dD = 1.j * np.imag(np.diag(dP)) * self.S_inv / 2
-        # Compute dX, dS and dY
-        dX = self.X@(self.F * (dP*self.S + self.S[:, np.newaxis]*np.conj(dP.T)) + np.diag(dD)) + (np.eye(l*D1) - self.X@np.conj(self.X.T))@dUtheta@self.Y * self.S_inv
+        # Compute dX, dS and dY. The projections (1 - XX^\dagger) and (1 - YY^\dagger) are applied without forming them.
+        dX = self.X@(self.F * (dP*self.S + self.S[:, np.newaxis]*np.conj(dP.T)) + np.diag(dD)) + (dUthetaY - self.X@dP) * self.S_inv
         dS = np.real(np.diag(dP))[:self.chi]
-        dY = self.Y@(self.F * (self.S[:, np.newaxis]*dP + np.conj(dP.T)*self.S) - np.diag(dD)) + (np.eye(D2*r) - self.Y@np.conj(self.Y.T))@np.conj(dUtheta.T)@self.X * self.S_inv
+        dY = self.Y@(self.F * (self.S[:, np.newaxis]*dP + np.conj(dP.T)*self.S) - np.diag(dD)) + (dUthetaX - self.Y@(np.conj(self.Y.T)@dUthetaX)) * self.S_inv
         # Compute first term of the product rule
         result = np.sum(self.S_trunc*dS) * (self.XSYtheta - self.XSYthetaUU) / self.cost**2
         # Compute helper tensor necessary for computing the first two of the remaining four terms
         dXSY = (dX[:, :self.chi]*self.S_trunc)@self.Y_trunc.T.conj()
         dXSY += (self.X_trunc*dS)@self.Y_trunc.T.conj()
         dXSY += (self.X_trunc*self.S_trunc)@dY.T.conj()[:self.chi, :]
-        dXSY = dXSY.reshape(l, D1, D2, r)
         # first of four remaining terms
-        temp_result = np.tensordot(dXSY, np.conj(self.theta), ([0, 3], [0, 3])) # [l] i j [r]; [l*] k* l* [r*] -> i j k* l*
+        temp_result = self._contract_theta_conj(dXSY).reshape(D1, D2, D1, D2) # [l] i j [r]; [l*] k* l* [r*] -> i j k* l*
         # second of four remaining terms
-        temp = np.tensordot(np.conj(temp_result), self.U, ([2, 3], [2, 3])) # i* j* [k*] [l*]; i j [k] [l] -> i* j* i j
-        temp = np.tensordot(temp, self.U, ([0, 1], [0, 1])) # [i*] [j*] i j; [i] [j] k l -> i j k l
-        temp_result -= temp
+        temp_result -= self._contract_conj_sandwich(self.U, temp_result, self.U)
         # third of four remaining terms
-        temp = np.tensordot(np.conj(self.XSYtheta), dU, ([2, 3], [2, 3])) # i* j* [k*] [l*]; i j [k] [l] -> i* j* i j
-        temp = np.tensordot(temp, self.U, ([0, 1], [0, 1])) # [i*] [j*] i j; [i] [j] k l -> i j k l
-        temp_result -= temp
+        temp_result -= self._contract_conj_sandwich(dU, self.XSYtheta, self.U)
         # fourth of four remaining terms
-        temp = np.tensordot(np.conj(self.XSYtheta), self.U, ([2, 3], [2, 3])) # i* j* [k*] [l*]; i j [k] [l] -> i* j* i j
-        temp = np.tensordot(temp, dU, ([0, 1], [0, 1])) # [i*] [j*] i j; [i] [j] k l -> i j k l
-        temp_result -= temp
+        temp_result -= self._contract_conj_sandwich(self.U, self.XSYtheta, dU)
         # Compute final result
         result = -(result + temp_result) / 2 / self.cost
         # Project to tangent space and return
@@ -270,7 +431,7 @@ class TruncErrorIterateApproxTRM(TruncErrorIterate):
     This is especially useful when multiple hessian vector products must be computed.
     """
 
-    def __init__(self, U, theta, chi, chi_max, N_iters_svd=None, eps_svd=0.0, old_iterate=None):
+    def __init__(self, U, theta, chi, chi_max, N_iters_svd=None, eps_svd=0.0, old_iterate=None, dtype_internal=None, step_size_svd=None):
         """
         Initializes new iterate.
 
@@ -278,7 +439,7 @@ class TruncErrorIterateApproxTRM(TruncErrorIterate):
         ----------
         See class TruncErrorIterate.
         """
-        TruncErrorIterate.__init__(self, U, theta, chi, chi_max=chi_max, N_iters_svd=N_iters_svd, eps_svd=eps_svd, old_iterate=old_iterate)
+        TruncErrorIterate.__init__(self, U, theta, chi, chi_max=chi_max, N_iters_svd=N_iters_svd, eps_svd=eps_svd, old_iterate=old_iterate, dtype_internal=dtype_internal, step_size_svd=step_size_svd)
         self.computed_gradient = False
         self.computed_hessian = False
 
@@ -292,21 +453,25 @@ class TruncErrorIterateApproxTRM(TruncErrorIterate):
             value of the cost function
         """
         # Compute Utheta
-        Utheta = np.dot(np.ascontiguousarray(self.U).reshape((self.D1*self.D2, -1)), np.ascontiguousarray(self.theta.transpose(1, 2, 0, 3)).reshape(self.D1*self.D2, -1)) # l, i, j, r -> i, j, l, r -> (i, j), (l, r)
-        Utheta = np.ascontiguousarray(np.ascontiguousarray(Utheta).reshape((self.D1, self.D2, self.l, self.r)).transpose((2, 0, 1, 3))).reshape((self.l*self.D1, -1)) # (i, j), (l, r) -> i, j, l, r -> l, i, j, r -> (l, i), (j, r)
+        Utheta = self._contract_U_theta(self.U, use_buffer=True)
         # Renormalize (might not be normalized due to numerical errors)
         Utheta /= np.linalg.norm(Utheta)
         # Perform SVD
-        if self.N_iters_svd is None or self.chi_max is None:
+        if self.chi_max is None:
             self.X, self.S, self.Y = utility.safe_svd(Utheta, full_matrices=False) # { D^9 }
-            if self.chi_max is not None:
-                idx = np.argsort(self.S)[::-1][:self.chi_max]
-                self.X, self.S, self.Y = self.X[:, idx], self.S[idx], self.Y[idx, :]
-        else:
-            self.X, self.Y, _, _ = utility.split_matrix_iterate_QR(Utheta, self.chi_max, self.N_iters_svd, self.eps_svd, C0=self.Y0, normalize=False) # { N_iters_svd * D^7 }
-            self.Y0 = self.Y
+        elif self.N_iters_svd is None:
+            self.X, self.S, self.Y = utility.truncated_svd(Utheta, self.chi_max) # { D^9 }
+        elif self.V0 is None or self.k == min(self.l*self.D1, self.D2*self.r):
+            self.X, self.Y = self._split_matrix_iterate_QR(Utheta, self.chi_max) # { N_iters_svd * D^7 }
             XX, self.S, self.Y = np.linalg.svd(self.Y, full_matrices=False) # { D^5 }
             self.X = self.X@XX
+            self.V0 = np.conj(self.Y.T)
+        else:
+            # The hessian needs the singular values, so the (small) core matrix still has to be diagonalized
+            self.X, C, self.V0 = self._split_projector_splitting(Utheta, self.V0) # { N_iters_svd * D^7 }
+            XX, self.S, YY = np.linalg.svd(C) # { D^3 }
+            self.X = self.X@XX
+            self.Y = YY@np.conj(self.V0.T)
         self.Y = np.conj(self.Y.T)
         if self.chi_max is None or self.chi < self.chi_max:
             self.X_trunc, self.S_trunc, self.Y_trunc = self.X[:, :self.chi], self.S[:self.chi], self.Y[:, :self.chi]
@@ -331,12 +496,8 @@ class TruncErrorIterateApproxTRM(TruncErrorIterate):
             gradient of the cost function
         """
         if not self.computed_gradient:
-            self.Xtheta = np.tensordot(self.X.reshape(self.l, self.D1, -1), np.conj(self.theta), ([0], [0])) # [l] i chi; [l*] k* l* r* -> i chi k* l* r* { D^8 }
-            self.XStheta = np.tensordot(self.Xtheta[:, :self.chi, :, :, :], np.diag(self.S_trunc), ([1], [0])) # i [chi] k* l* r*; [chi] chi -> i k* l* r* chi { D^7 }
-            self.XSYtheta = np.tensordot(self.XStheta, np.conj(self.Y_trunc.reshape(self.D2, self.r, -1)), ([3, 4], [1, 2])) # i k* l* [r*] [chi]; j [r] [chi] -> i k* l* j  { D^7 }
-            self.XSYtheta = self.XSYtheta.transpose(0, 3, 1, 2) # i, k*, l*, j -> i, j, k*, l*
-            self.XSYthetaUU = np.tensordot(np.conj(self.XSYtheta), self.U, ([2, 3], [2, 3])) # i' j' [k'] [l']; i j [k'] [l'] -> i' j' i j { D^6 }
-            self.XSYthetaUU = np.tensordot(self.XSYthetaUU, self.U, ([0, 1], [0, 1])) # [i'] [j'] i j; [i'] [j'] k l -> i j k l { D^6 }
+            self.XSYtheta = self._contract_theta_conj((self.X_trunc*self.S_trunc)@np.conj(self.Y_trunc.T)).reshape(self.D1, self.D2, self.D1, self.D2) # { D^8 }
+            self.XSYthetaUU = self._contract_conj_sandwich(self.U, self.XSYtheta, self.U) # { D^6 }
             self.computed_gradient = True
         if self.cost == 0:
             # Avoid dividing by zero
@@ -364,6 +525,7 @@ class TruncErrorIterateApproxTRM(TruncErrorIterate):
             return np.zeros(self.U.shape)
         if not self.computed_hessian:
             # Cache helper results
+            self.Xtheta = np.tensordot(self.X.reshape(self.l, self.D1, -1), np.conj(self.theta), ([0], [0])) # [l] i chi; [l*] k* l* r* -> i chi k* l* r* { D^8 }
             self.F = np.zeros((self.k, self.k)) # { D^2 }
             for i in range(self.k):
                 for j in range(self.k):
@@ -410,16 +572,191 @@ class TruncErrorIterateApproxTRM(TruncErrorIterate):
         temp += np.tensordot(temp2, np.conj(dY.reshape(self.D2, self.r, -1))[:, :, :self.chi], ([3, 4], [1, 2])).transpose(0, 3, 1, 2) # i k l [r] [chi]; j [r] [chi] -> i k l j -> i j k l { D^7 }
         result += temp
         # Compute third of five terms
-        temp = np.tensordot(np.conj(temp), self.U, ([2, 3], [2, 3])) # i j [k] [l]; i j [k] [l] -> i j i j { D^6 }
-        result -= np.tensordot(temp, self.U, ([0, 1], [0, 1])) # [i] [j] i j; [i] [j] k l -> i j k l { D^6 }
+        result -= self._contract_conj_sandwich(self.U, temp, self.U) # { D^6 }
         # Compute fourth of five terms
-        temp = np.tensordot(np.conj(self.XSYtheta), dU, ([2, 3], [2, 3])) # i j [k] [l]; i j [k] [l] -> i j i j { D^6 }
-        result -= np.tensordot(temp, self.U, ([0, 1], [0, 1])) # [i] [j] i j; [i] [j] k l -> i j k l { D^6 }
+        result -= self._contract_conj_sandwich(dU, self.XSYtheta, self.U) # { D^6 }
         # Compute fifth of five terms
-        temp = np.tensordot(np.conj(self.XSYtheta), self.U, ([2, 3], [2, 3])) # i j [k] [l]; i j [k] [l] -> i j i j { D^6 }
-        result -= np.tensordot(temp, dU, ([0, 1], [0, 1])) # [i] [j] i j; [i] [j] k l -> i j k l { D^6 }
+        result -= self._contract_conj_sandwich(self.U, self.XSYtheta, dU) # { D^6 }
         # Compute final result
         result = (-result / 2 / self.cost).reshape(self.D1*self.D2, -1)
         # Project to tangent space and return
         U = self.U.reshape(result.shape)
-        return (result - 0.5 * U@(U.conj().T@result + result.conj().T@U)).reshape(self.D1, self.D2, self.D1, self.D2)
\ No newline at end of file
+        return (result - 0.5 * U@(U.conj().T@result + result.conj().T@U)).reshape(self.D1, self.D2, self.D1, self.D2)
+
+class TruncErrorIterateCGBatched:
+    """
+    Class representing a batch of iterates of the trunc error Conjugate Gradients optimizer, one for each of B independent
+    disentangling problems with wavefunction tensors of the same shape. All linear algebra is done on stacks of matrices,
+    such that the python overhead is shared between all problems of the batch. Costs are returned as arrays of shape (B,).
+    """
+
+    def __init__(self, U, theta, chi, N_iters_svd=None, eps_svd=0.0, old_iterate=None):
+        """
+        Initializes new batch of iterates.
+
+        Parameters
+        ----------
+        U : np.ndarray of shape (B, i, j, i*, j*)
+            batch of disentangling unitaries.
+        theta : np.ndarray of shape (B, l, i, j, r)
+            batch of wavefunction tensors to be disentangled.
+        chi : int
+            Splitting bond dimension for computing the truncation error (cost function).
+        N_iters_svd : int or None, optional
+            number of projector-splitting sweeps used for approximating the SVD, warm-started from old_iterate.
+            If this is set to None or if no old iterate is given, a full SVD is performed instead. Default: None.
+        eps_svd : float, optional
+            if the relative decrease of the truncation error after one sweep is smaller than eps_svd for all
+            problems of the batch, the sweeps are terminated. Default: 0.0.
+        old_iterate : element of TruncErrorIterateCGBatched class or None, optional
+            old batch of iterates, used for warm-starting the projector-splitting sweeps and for sharing the
+            matricized conjugate of theta. Default: None.
+        """
+        self.U = U
+        self.theta = theta
+        self.chi = chi
+        self.N_iters_svd = N_iters_svd
+        self.eps_svd = eps_svd
+        self.B, self.l, self.D1, self.D2, self.r = self.theta.shape
+        self.V0 = None
+        if self.N_iters_svd is not None and old_iterate is not None:
+            self.V0 = old_iterate.V0
+        self.theta_mat_conj = None
+        # Output buffer of U@theta, shared between iterates of the same theta
+        self._utheta = None
+        if old_iterate is not None and old_iterate.theta is theta:
+            self.theta_mat_conj = old_iterate.theta_mat_conj
+            self._utheta = old_iterate._utheta
+
+    def get_iterate(self):
+        """
+        Returns the actual batch of iterates (the disentangling unitaries of shape (B, i, j, i*, j*)).
+
+        Returns
+        -------
+        U : np.ndarray of shape (B, i, j, i*, j*)
+            batch of disentangling unitaries.
+        """
+        return self.U
+
+    def select(self, mask, other):
+        """
+        Returns a new batch of iterates, that is equal to other where mask is True and equal to self everywhere else.
+        Both self and other must already have evaluated their cost function.
+
+        Parameters
+        ----------
+        mask : np.ndarray of shape (B,) and dtype bool
+            mask selecting the problems that are taken from other.
+        other : element of TruncErrorIterateCGBatched class
+            second batch of iterates.
+
+        Returns
+        -------
+        result : element of TruncErrorIterateCGBatched class
+            the merged batch of iterates.
+        """
+        result = TruncErrorIterateCGBatched(np.where(mask[:, np.newaxis, np.newaxis, np.newaxis, np.newaxis], other.U, self.U), self.theta, self.chi, N_iters_svd=self.N_iters_svd, eps_svd=self.eps_svd)
+        result.theta_mat_conj = self.theta_mat_conj if self.theta_mat_conj is not None else other.theta_mat_conj
+        result._utheta = self._utheta if self._utheta is not None else other._utheta
+        result.cost = np.where(mask, other.cost, self.cost)
+        if self.chi < min(self.l*self.D1, self.D2*self.r):
+            mask = mask[:, np.newaxis, np.newaxis]
+            result.X = np.where(mask, other.X, self.X)
+            result.C = np.where(mask, other.C, self.C)
+            result.Y = np.where(mask, other.Y, self.Y)
+            if self.V0 is not None and other.V0 is not None:
+                result.V0 = np.where(mask, other.V0, self.V0)
+        return result
+
+    def subset(self, idx):
+        """
+        Returns the batch of iterates restricted to the problems with indices idx.
+        self must already have evaluated its cost function.
+
+        Parameters
+        ----------
+        idx : np.ndarray of dtype int
+            indices of the problems that are kept.
+
+        Returns
+        -------
+        result : element of TruncErrorIterateCGBatched class
+            the smaller batch of iterates.
+        """
+        result = TruncErrorIterateCGBatched(self.U[idx], self.theta[idx], self.chi, N_iters_svd=self.N_iters_svd, eps_svd=self.eps_svd)
+        if self.theta_mat_conj is not None:
+            result.theta_mat_conj = self.theta_mat_conj[idx]
+        result.cost = self.cost[idx]
+        if self.chi < min(self.l*self.D1, self.D2*self.r):
+            result.X, result.C, result.Y = self.X[idx], self.C[idx], self.Y[idx]
+            if self.V0 is not None:
+                result.V0 = self.V0[idx]
+        return result
+
+    def evaluate_cost_function(self):
+        """
+        Computes the truncation errors sqrt(1 - sum_{i=1}^{chi} s_i**2) with s_i the ith singular value of U@theta,
+        for all problems of the batch.
+
+        Returns
+        -------
+        cost : np.ndarray of shape (B,)
+            values of the cost function
+        """
+        if self.chi >= min(self.l*self.D1, self.D2*self.r):
+            self.cost = np.zeros(self.B)
+            return self.cost
+        # Compute Utheta
+        dtype = np.result_type(self.U, self.theta)
+        if self._utheta is None or self._utheta.dtype != dtype:
+            self._utheta = np.empty((self.B, self.l, self.D1*self.D2, self.r), dtype=dtype)
+        Utheta = np.matmul(self.U.reshape(self.B, 1, self.D1*self.D2, self.D1*self.D2), self.theta.reshape(self.B, self.l, self.D1*self.D2, self.r), out=self._utheta).reshape(self.B, self.l*self.D1, self.D2*self.r) # B i j [i*] [j*]; B l [i] [j] r -> B l i j r
+        # Renormalize (might not be normalized due to numerical errors)
+        Utheta /= np.linalg.norm(Utheta, axis=(1, 2))[:, np.newaxis, np.newaxis]
+        # Perform SVD. The truncated Utheta is stored as X@C@Y, where C is not necessarily diagonal.
+        if self.V0 is None:
+            self.X, S, self.Y = np.linalg.svd(Utheta, full_matrices=False) # { D^9 }
+            self.X, S, self.Y = self.X[:, :, :self.chi], S[:, :self.chi], self.Y[:, :self.chi, :]
+            self.C = S[:, :, np.newaxis] * np.eye(self.chi)
+            if self.N_iters_svd is not None:
+                self.V0 = np.conj(self.Y.transpose(0, 2, 1))
+        else:
+            error = None
+            V = self.V0
+            for _ in range(self.N_iters_svd):
+                X, _ = np.linalg.qr(Utheta@V) # { D^7 }
+                V, R = np.linalg.qr(np.conj(Utheta.transpose(0, 2, 1))@X) # { D^7 }
+                error_new = np.sqrt(np.maximum(1 - np.linalg.norm(R, axis=(1, 2))**2, 0.0))
+                if error is not None and np.all(np.isclose(error_new, 0) | (np.abs(error - error_new) < self.eps_svd * np.abs(error))):
+                    break
+                error = error_new
+            self.X, self.C, self.V0 = X, np.conj(R.transpose(0, 2, 1)), V
+            self.Y = np.conj(V.transpose(0, 2, 1))
+        # Compute cost function.
+        # 1 - ||C||^2 should be larger than zero, but can be lower than zero due to numerical errors.
+        self.cost = np.sqrt(np.maximum(1 - np.linalg.norm(self.C, axis=(1, 2))**2, 0.0))
+        return self.cost
+
+    def compute_gradient(self):
+        """
+        Computes the gradients of the truncation error cost function, projected to the tangent spaces of the iterates.
+
+        Returns
+        -------
+        grad : np.ndarray of shape (B, i, j, i*, j*)
+            gradients of the cost function
+        """
+        if self.chi >= min(self.l*self.D1, self.D2*self.r):
+            return np.zeros(self.U.shape, dtype=self.U.dtype)
+        n = self.D1*self.D2
+        if self.theta_mat_conj is None:
+            self.theta_mat_conj = np.ascontiguousarray(np.conj(self.theta.reshape(self.B, self.l, n, self.r)).transpose(0, 2, 1, 3)).reshape(self.B, n, self.l*self.r) # B, l*, (i j)*, r* -> B, (i j)*, (l r)*
+        grad = np.ascontiguousarray((self.X@self.C@self.Y).reshape(self.B, self.l, n, self.r).transpose(0, 2, 1, 3)).reshape(self.B, n, self.l*self.r) # -> B, (i j), (l r)
+        grad = grad@self.theta_mat_conj.transpose(0, 2, 1) # B (i j) [(l r)]; B [(l r)*] (i j)* -> B (i j) (i j)*
+        # Avoid dividing by zero for problems that are already disentangled
+        nonzero = self.cost > 1e-14
+        grad = -grad * np.where(nonzero, 1/np.where(nonzero, self.cost, 1.0), 0.0)[:, np.newaxis, np.newaxis]
+        U = self.U.reshape(self.B, self.D1*self.D2, self.D1*self.D2)
+        temp = np.conj(U).transpose(0, 2, 1)@grad
+        return (grad - 0.5 * U@(temp + np.conj(temp).transpose(0, 2, 1))).reshape(self.B, self.D1, self.D2, self.D1, self.D2)
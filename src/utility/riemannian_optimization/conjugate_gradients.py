@@ -12,7 +12,7 @@ Sources:
 [7] William W. Hager and Hongchao Zhang, "Algorithm 851: CG DESCENT, a Conjugate Gradient Method with Guaranteed Descent", https://www.math.lsu.edu/~hozhang/papers/cg_compare.pdf
 """
 
-def _beta_hestenes_stiefel(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_hestenes_stiefel(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor by hestenes and stiefel, used for computing the next search direction.
 
@@ -30,17 +30,20 @@ def _beta_hestenes_stiefel(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
     beta:
         the computed beta factor
     """
-    grad_k_transported = manifold.transport(x_kp1, grad_k)
+    if grad_k_transported is None:
+        grad_k_transported = manifold.transport(x_kp1, grad_k)
     y = grad_kp1 - grad_k_transported
     return manifold.inner_product(grad_kp1, y) / manifold.inner_product(mu_k, y)
 
-def _beta_fletcher_reeves(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_fletcher_reeves(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor by fletcher and reeves, used for computing the next search direction.
 
@@ -58,6 +61,8 @@ def _beta_fletcher_reeves(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
@@ -66,7 +71,7 @@ def _beta_fletcher_reeves(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
     """
     return manifold.inner_product(grad_kp1, grad_kp1) / manifold.inner_product(grad_k, grad_k)
 
-def _beta_polark_riberie(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_polark_riberie(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor by polar and riberie, used for computing the next search direction.
 
@@ -84,17 +89,20 @@ def _beta_polark_riberie(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
     beta:
         the computed beta factor
     """
-    grad_k_transported = manifold.transport(x_kp1, grad_k)
+    if grad_k_transported is None:
+        grad_k_transported = manifold.transport(x_kp1, grad_k)
     y = grad_kp1 - grad_k_transported
     return manifold.inner_product(grad_kp1, y) / manifold.inner_product(grad_k, grad_k)
 
-def _beta_conjugate_descent(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_conjugate_descent(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor from the conjugate descent algorithm, used for computing the next search direction.
 
@@ -112,6 +120,8 @@ def _beta_conjugate_descent(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
@@ -120,7 +130,7 @@ def _beta_conjugate_descent(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
     """
     return manifold.inner_product(grad_kp1, grad_kp1) / -manifold.inner_product(mu_k, grad_k)
 
-def _beta_liu_storey(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_liu_storey(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor by liu and storey, used for computing the next search direction.
 
@@ -138,17 +148,20 @@ def _beta_liu_storey(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
     beta:
         the computed beta factor
     """
-    grad_k_transported = manifold.transport(x_kp1, grad_k)
+    if grad_k_transported is None:
+        grad_k_transported = manifold.transport(x_kp1, grad_k)
     y = grad_kp1 - grad_k_transported
     return manifold.inner_product(grad_kp1, y) / -manifold.inner_product(mu_k, grad_k)
 
-def _beta_dai_yuan(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_dai_yuan(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor by dai and yuan, used for computing the next search direction.
 
@@ -166,18 +179,21 @@ def _beta_dai_yuan(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
     beta:
         the computed beta factor
     """
-    grad_k_transported = manifold.transport(x_kp1, grad_k)
+    if grad_k_transported is None:
+        grad_k_transported = manifold.transport(x_kp1, grad_k)
     y = grad_kp1 - grad_k_transported
     mu_k_transported = manifold.transport(x_kp1, mu_k)
     return manifold.inner_product(grad_kp1, grad_kp1) / manifold.inner_product(mu_k_transported, y)
 
-def _beta_hager_zhang(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
+def _beta_hager_zhang(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k, grad_k_transported=None):
     """
     Computes the beta factor by hager and zhang, used for computing the next search direction.
 
@@ -195,19 +211,69 @@ def _beta_hager_zhang(manifold, x_k, x_kp1, grad_k, grad_kp1, mu_k):
         gradient at the next iterate, element of the tangent space of x_kp1
     mu_k : np.ndarray
         current search direction
+    grad_k_transported : np.ndarray or None, optional
+        grad_k transported to the tangent space of x_kp1. If this is None, it is computed if needed. Default: None.
 
     Returns
     -------
     beta:
         the computed beta factor
     """
-    grad_k_transported = manifold.transport(x_kp1, grad_k)
+    if grad_k_transported is None:
+        grad_k_transported = manifold.transport(x_kp1, grad_k)
     y = grad_kp1 - grad_k_transported
     mu_k_transported = manifold.transport(x_kp1, mu_k)
     temp = manifold.inner_product(mu_k_transported, y)
     result = y - 2*mu_k_transported * manifold.inner_product(y, y) / temp
     return manifold.inner_product(result, grad_kp1) / temp
 
+class IterateFactory:
+    """
+    Callable that constructs the iterates for the Conjugate Gradients optimizer, see the construct_iterate
+    parameter of ConjugateGradientsOptimizer. The problem data is stored once, and the iterate class is called
+    with keyword arguments for every new iterate.
+    """
+    __slots__ = ("iterate_class", "theta", "warm_start", "kwargs")
+
+    def __init__(self, iterate_class, theta, warm_start=True, **kwargs):
+        """
+        Initializes the factory.
+
+        Parameters
+        ----------
+        iterate_class : class
+            class of the iterates, called as iterate_class(U, theta, old_iterate=old_iterate, **kwargs).
+        theta : np.ndarray
+            wavefunction tensor, passed into the constructor of iterate_class.
+        warm_start : bool, optional
+            if False, old_iterate=None is passed into the constructor of iterate_class instead of the
+            previous iterate. Default: True.
+        **kwargs :
+            additional keyword arguments passed into the constructor of iterate_class.
+        """
+        self.iterate_class = iterate_class
+        self.theta = theta
+        self.warm_start = warm_start
+        self.kwargs = kwargs
+
+    def __call__(self, U, old_iterate):
+        """
+        Constructs a new iterate.
+
+        Parameters
+        ----------
+        U : np.ndarray
+            point on the manifold.
+        old_iterate : element of iterate_class or None
+            the previous iterate.
+
+        Returns
+        -------
+        iterate : element of iterate_class
+            the new iterate.
+        """
+        return self.iterate_class(U, self.theta, old_iterate=old_iterate if self.warm_start else None, **self.kwargs)
+
 class ConjugateGradientsOptimizer:
     """
     Class implementing the Conjugate Gradients algorithm on Riemannian manifolds. To use this class, first initialize an instance of
@@ -419,7 +485,8 @@ class ConjugateGradientsOptimizer:
                 break
             # Compute new gradient and beta
             new_gradient = new_iterate.compute_gradient()
-            if self.manifold.norm(new_gradient) < self.grad_norm_eps:
+            new_gradient_norm = self.manifold.norm(new_gradient)
+            if new_gradient_norm < self.grad_norm_eps:
                 # Termination because of small gradient
                 iterate = new_iterate
                 cost = new_cost
@@ -432,11 +499,11 @@ class ConjugateGradientsOptimizer:
             # Check if we want to restart (Powell's restart strategy, see [5])
             transported_gradient = self.manifold.transport(new_iterate.get_iterate(), gradient)
             beta = 0
-            if np.abs(self.manifold.inner_product(new_gradient, transported_gradient)) >= self.restart_factor * self.manifold.norm(new_gradient) * self.manifold.norm(transported_gradient):
+            if abs(self.manifold.inner_product(new_gradient, transported_gradient)) >= self.restart_factor * new_gradient_norm * self.manifold.norm(transported_gradient):
                 # Restart CG by setting the update direction to the negative gradient (equivalent to beta = 0)
                 num_restarts_powell += 1
             else:
-                beta = self.compute_beta(self.manifold, iterate.get_iterate(), new_iterate.get_iterate(), gradient, new_gradient, search_direction)
+                beta = self.compute_beta(self.manifold, iterate.get_iterate(), new_iterate.get_iterate(), gradient, new_gradient, search_direction, grad_k_transported=transported_gradient)
             # Compute next search direction
             if beta != 0:
                 transported_search_direction = self.manifold.transport(new_iterate.get_iterate(), search_direction)
@@ -452,4 +519,223 @@ class ConjugateGradientsOptimizer:
                 step_sizes.append(step_size)
             if log_iterates:
                 iterates.append(iterate.get_iterate())
-        return iterate.get_iterate(), n, num_restarts_not_descent, num_restarts_powell, (costs, step_sizes, iterates)
\ No newline at end of file
+        return iterate.get_iterate(), n, num_restarts_not_descent, num_restarts_powell, (costs, step_sizes, iterates)
+
+class ConjugateGradientsOptimizerBatched(ConjugateGradientsOptimizer):
+    """
+    Class implementing the Conjugate Gradients algorithm for a batch of B independent optimization problems on Riemannian manifolds.
+    The algorithm is the same as in ConjugateGradientsOptimizer, but all quantities that are scalars there (costs, slopes, step sizes, beta)
+    are arrays of shape (B,) here, and all decisions (line search acceptance, restarts, termination) are made per problem.
+    Problems that have terminated are masked out and keep their final iterate. Once at most half of the problems in the
+    current batch are still active, the batch is compacted to the active problems, such that terminated problems no longer
+    cost any work.
+    The manifold must be a batched manifold (e.g. ComplexStiefelManifoldBatched), and the iterates are instances of a batched iterate
+    class, which in addition to the functions of a normal iterate class must implement select(mask, other), returning the
+    batch of iterates that is equal to other where mask is True and equal to the original batch of iterates everywhere else,
+    and subset(idx), returning the batch of iterates restricted to the problems with indices idx. Since the batch shrinks
+    during optimization, construct_iterate must take all problem-specific data (e.g. the wavefunction tensors) from the
+    old iterate that is passed to it.
+    For an example see the TruncErrorIterateCGBatched class from src/utility/disentangle/truncErrorIterate.py.
+    """
+
+    def __init__(self, manifold, construct_iterate, beta_rule="hestenes_stiefel", **kwargs):
+        """
+        Initializes the class.
+
+        Parameters
+        ----------
+        See class ConjugateGradientsOptimizer. The beta rule "hager_zhang" is not supported for batched optimization.
+        """
+        if beta_rule == "hager_zhang":
+            raise NotImplementedError(f"beta_rule \"{beta_rule}\" is not implemented for batched optimization.")
+        ConjugateGradientsOptimizer.__init__(self, manifold, construct_iterate, beta_rule=beta_rule, **kwargs)
+
+    def _line_search_adaptive(self, iterate, search_direction, slope, cost, old_alpha=None):
+        """
+        Performs an adaptive armijo-like line search for each problem of the batch.
+
+        Parameters
+        ----------
+        iterate : instance of batched iterate class
+            the current batch of iterates.
+        search_direction : np.ndarray
+            the current batch of search directions.
+        slope : np.ndarray of shape (B,)
+            the slopes of the cost functions at the current iterates when moving along the current search directions.
+        cost : np.ndarray of shape (B,)
+            the values of the cost functions at the current iterates
+        old_alpha : np.ndarray of shape (B,) or None, optional:
+            the old values of the final alpha during the last call to this function, or None if this
+            is the first time calling this function.
+
+        Returns
+        -------
+        step_size : np.ndarray of shape (B,)
+            the step sizes found by the line search algorithm
+        new_iterate : instance of batched iterate class
+            the next batch of iterates.
+        new_cost : np.ndarray of shape (B,)
+            the values of the cost functions at the next iterates
+        alpha : np.ndarray of shape (B,)
+            the alpha values that can be used fo the old_alpha parameter when calling this function the next time.
+        """
+        search_direction_norm = self.manifold.norm(search_direction)
+        if old_alpha is not None:
+            alpha = old_alpha
+        else:
+            # Problems with zero search direction (e.g. terminated problems) do not move
+            alpha = np.where(search_direction_norm > 0, self.ls_initial_step_size / np.where(search_direction_norm > 0, search_direction_norm, 1.0), 0.0)
+        expand = lambda a : a.reshape((-1,) + (1,)*(search_direction.ndim-1))
+
+        # Make the step and compute the cost
+        new_iterate = self.construct_iterate(self.manifold.retract(iterate.get_iterate(), expand(alpha)*search_direction), iterate)
+        new_cost = new_iterate.evaluate_cost_function()
+        cost_evaluations = np.ones(alpha.shape, dtype=int)
+        # Problems that do not move (alpha = 0) are not backtracked
+        backtrack = (new_cost > cost - self.ls_sufficient_decrease * alpha * slope) & (cost_evaluations < self.ls_max_iterations) & (alpha > 0)
+
+        while np.any(backtrack):
+            # Reduce step size
+            alpha = np.where(backtrack, alpha * self.ls_contraction_factor, alpha)
+
+            # Make the step and compute the cost
+            trial_iterate = self.construct_iterate(self.manifold.retract(iterate.get_iterate(), expand(alpha)*search_direction), new_iterate)
+            trial_cost = trial_iterate.evaluate_cost_function()
+            new_iterate = new_iterate.select(backtrack, trial_iterate)
+            new_cost = new_iterate.cost
+            cost_evaluations += backtrack
+            backtrack = backtrack & (new_cost > cost - self.ls_sufficient_decrease * alpha * slope) & (cost_evaluations < self.ls_max_iterations)
+
+        # If after the maximum number of iterations we still have not managed
+        # to decrease the cost, do not do anything
+        failed = new_cost >= cost
+        alpha = np.where(failed, 0, alpha)
+        new_iterate = new_iterate.select(failed, iterate)
+        new_cost = new_iterate.cost
+
+        step_size = alpha * search_direction_norm
+
+        # We expect on average two evaluations. If things went very well, or we had to backtrack a lot,
+        # the stepsize is probably quite small and we can speed up
+        return step_size, new_iterate, new_cost, np.where(cost_evaluations == 2, alpha, 2*alpha)
+
+    def optimize(self, initial_iterate, log_debug_info=False, log_iterates=False):
+        """
+        Optimizes the given batch of initial iterates with the Conjugate Gradients algorithm.
+
+        Parameters
+        ----------
+        initial_iterate : instance of batched iterate class
+            the batch of initial iterates
+        log_debug_info : bool, optional
+            wether to store and return per-iteration debug information (costs and step sizes). Default: False.
+        log_iterates : bool, optional
+            wether to store and return all iterates. Default: False.
+
+        Returns
+        -------
+        final_iterate : np.ndarray
+            the batch of final iterates
+        num_iters : np.ndarray of shape (B,)
+            the number of iterations the algorithm was run for, per problem
+        num_restarts_not_descent : np.ndarray of shape (B,)
+            number of restarts due to the search direction not being a descent direction, per problem
+        num_restarts_powell : np.ndarray of shape (B,)
+            number of restarts due to Powell's restart strategy (see [5]), per problem
+        debug_info : tuple
+            tuple with debug information, containing three lists: A list of costs (np.ndarray of shape (B,)), a list of
+            step sizes (np.ndarray of shape (B,)), and list of iterates (np.ndarray). If log_debug_info == False or
+            log_iterates == False, the corresponding entries in the tuple are None.
+        """
+        # Initital values
+        iterate = initial_iterate
+        cost = iterate.evaluate_cost_function()
+        gradient = iterate.compute_gradient()
+        expand = lambda a : a.reshape((-1,) + (1,)*(gradient.ndim-1))
+        B = cost.size
+        # Iinitialize search direction with negative gradient
+        search_direction = -gradient
+        # Keep track of the number of iterations and CG restarts
+        num_iters = np.zeros(B, dtype=int)
+        num_restarts_not_descent = np.zeros(B, dtype=int)
+        num_restarts_powell = np.zeros(B, dtype=int)
+        # The final iterates of all problems. Problems that are removed from the batch by compaction are stored here,
+        # all other problems are copied at the end. idx maps the problems of the current batch to the original ones.
+        final_iterate = np.array(iterate.get_iterate(), copy=True)
+        idx = np.arange(B)
+        # Debug logging
+        costs = None
+        step_sizes = None
+        iterates = None
+        if log_debug_info:
+            costs = [cost]
+            step_sizes = []
+            all_costs = np.array(cost, copy=True)
+        if log_iterates:
+            iterates = [initial_iterate.get_iterate()]
+        # Problems that have not terminated yet
+        active = self.manifold.norm(gradient) >= self.grad_norm_eps
+        search_direction = np.where(expand(active), search_direction, 0.0)
+        old_alpha = None
+        # Main loop
+        for _ in range(self.N_iters):
+            N_active = np.count_nonzero(active)
+            if N_active == 0:
+                break
+            if 2*N_active <= active.size:
+                # Compact the batch to the active problems
+                final_iterate[idx[~active]] = iterate.get_iterate()[~active]
+                keep = np.nonzero(active)[0]
+                iterate = iterate.subset(keep)
+                cost, gradient, search_direction, active, idx = cost[keep], gradient[keep], search_direction[keep], active[keep], idx[keep]
+                if old_alpha is not None:
+                    old_alpha = old_alpha[keep]
+            num_iters[idx] += active
+            slope = self.manifold.inner_product(gradient, search_direction)
+            not_descent = slope >= 0
+            if np.any(not_descent):
+                # This is not a descent direction. Restart CG by setting the update direction to the negative gradient
+                search_direction = np.where(expand(not_descent), -gradient, search_direction)
+                slope = np.where(not_descent, self.manifold.inner_product(gradient, search_direction), slope)
+                num_restarts_not_descent[idx] += not_descent & active
+            # Execute line search along update direction
+            step_size, new_iterate, new_cost, old_alpha = self._line_search_adaptive(iterate, search_direction, slope, cost, old_alpha)
+            # Terminated problems keep their iterate
+            new_iterate = iterate.select(active, new_iterate)
+            new_cost = new_iterate.cost
+            step_size = np.where(active, step_size, 0.0)
+            # Termination because of small step_size
+            terminated = step_size < self.step_size_eps
+            # Compute new gradient and beta
+            new_gradient = new_iterate.compute_gradient()
+            new_gradient_norm = self.manifold.norm(new_gradient)
+            # Termination because of small gradient
+            terminated |= new_gradient_norm < self.grad_norm_eps
+            # Check if we want to restart (Powell's restart strategy, see [5])
+            transported_gradient = self.manifold.transport(new_iterate.get_iterate(), gradient)
+            restart = np.abs(self.manifold.inner_product(new_gradient, transported_gradient)) >= self.restart_factor * new_gradient_norm * self.manifold.norm(transported_gradient)
+            num_restarts_powell[idx] += restart & active & ~terminated
+            with np.errstate(divide="ignore", invalid="ignore"):
+                beta = self.compute_beta(self.manifold, iterate.get_iterate(), new_iterate.get_iterate(), gradient, new_gradient, search_direction, grad_k_transported=transported_gradient)
+            # Restart CG by setting the update direction to the negative gradient (equivalent to beta = 0)
+            beta = np.where(restart | ~np.isfinite(beta), 0.0, beta)
+            # Compute next search direction
+            transported_search_direction = self.manifold.transport(new_iterate.get_iterate(), search_direction)
+            search_direction = -new_gradient + expand(beta) * transported_search_direction
+            # Update everything
+            gradient = new_gradient
+            iterate = new_iterate
+            cost = new_cost
+            active &= ~terminated
+            search_direction = np.where(expand(active), search_direction, 0.0)
+            if log_debug_info:
+                all_costs[idx] = cost
+                costs.append(all_costs.copy())
+                all_step_sizes = np.zeros(B)
+                all_step_sizes[idx] = step_size
+                step_sizes.append(all_step_sizes)
+            if log_iterates:
+                final_iterate[idx] = iterate.get_iterate()
+                iterates.append(final_iterate.copy())
+        final_iterate[idx] = iterate.get_iterate()
+        return final_iterate, num_iters, num_restarts_not_descent, num_restarts_powell, (costs, step_sizes, iterates)
@@ -1,4 +1,5 @@
 import numpy as np
+import functools
 
 class ComplexStiefelManifold:
     """
@@ -9,7 +10,7 @@ class ComplexStiefelManifold:
     - James Townsend, Niklas Koep, Sebastian Weichwald: "Pymanopt: A Python Toolbox for Optimization on Manifolds using Automatic Differentiation", https://arxiv.org/abs/1603.03236
     """
 
-    def __init__(self, n, p, shape=None):
+    def __init__(self, n, p, shape=None, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10):
         """
         Initializes the class.
 
@@ -21,6 +22,16 @@ class ComplexStiefelManifold:
             the actual shape of the tensors we are representing as isometries in this manifold.
             The legs must already be transposed such that reshaping shape into (n, p) is possible.
             If this is None, the default shape (n, m) is used. Default: None.
+        retraction : str, one of {"qr", "newton_schulz"}, optional
+            method used for retracting x + xi onto the manifold. "qr" uses the sign-fixed qr decomposition,
+            "newton_schulz" approximates the polar retraction with a fixed number of Newton-Schulz iterations, which only
+            requires matrix products. If the Newton-Schulz iteration did not converge, the qr retraction is used instead.
+            Default: "qr".
+        N_iters_newton_schulz : int, optional
+            number of Newton-Schulz iterations used for the "newton_schulz" retraction. Default: 3.
+        tol_newton_schulz : float, optional
+            if the residual ||X^dagger X - 1||_F after the Newton-Schulz iterations is larger than this tolerance, the
+            qr retraction is used instead. Default: 1e-10.
         """
         assert(n >= p)
         self.n = n
@@ -29,11 +40,17 @@ class ComplexStiefelManifold:
             self.shape = (n, p)
         else:
             self.shape = shape
+        if retraction not in ("qr", "newton_schulz"):
+            raise NotImplementedError(f"retraction \"{retraction}\" is not implemented!")
+        self.retraction = retraction
+        self.N_iters_newton_schulz = N_iters_newton_schulz
+        self.tol_newton_schulz = tol_newton_schulz
 
     def retract(self, x, xi=None):
         """
         Retracts x + xi onto the manifold using the qr decomposition. Extra steps are taken to ensure
-        uniqueness of the qr decomposition.
+        uniqueness of the qr decomposition. If self.retraction == "newton_schulz" and xi is given,
+        the polar retraction is approximated with Newton-Schulz iterations instead, see _retract_newton_schulz().
         
         Parameters
         ----------
@@ -47,16 +64,47 @@ class ComplexStiefelManifold:
         result : np.ndarray of shape self.shape
             the retracted isometric tensor
         """
-        x_copy = x.copy()
         temp = x.reshape((self.n, self.p))
         if xi is not None:
-            temp = temp + xi.reshape((self.n, self.p))
-        assert(np.allclose(x, x_copy))
+            xi = xi.reshape((self.n, self.p))
+            if self.retraction == "newton_schulz":
+                result = self._retract_newton_schulz(temp, xi)
+                if result is not None:
+                    return np.reshape(result, self.shape)
+            temp = temp + xi
         Q, R = np.linalg.qr(temp)
         # Ensure uniqueness of QR decomposition by flipping signs of rows such that
-        # all diagonal elements of R are positive
-        P = np.diag(np.sign(np.diag(R)))
-        return np.reshape(Q@P, self.shape)
+        # all diagonal elements of R are positive. Multiplying with the diagonal sign
+        # matrix from the right is done by broadcasting instead of a matrix product.
+        return np.reshape(Q*np.sign(np.diag(R)), self.shape)
+
+    def _retract_newton_schulz(self, x, xi):
+        """
+        Approximates the polar retraction of x + xi with the Newton-Schulz iteration X <- X(3 - X^dagger X)/2.
+        For an isometry x and a tangent vector xi it holds (x + xi)^dagger(x + xi) = 1 + xi^dagger xi, such that
+        all singular values of x + xi lie in [1, sqrt(1 + ||xi||_F^2)]. Prescaling with the upper bound thus
+        places them in (0, 1], where the iteration converges quadratically to the polar factor.
+
+        Parameters
+        ----------
+        x : np.ndarray of shape (n, m)
+            element of the complex stiefel manifold.
+        xi : np.ndarray of shape (n, m)
+            element of the tangent space of x.
+
+        Returns
+        -------
+        result : np.ndarray of shape (n, m) or None
+            the retracted isometry, or None if the residual ||X^dagger X - 1||_F is larger than self.tol_newton_schulz.
+        """
+        X = (x + xi) / np.sqrt(1 + np.real(np.vdot(xi, xi)))
+        for _ in range(self.N_iters_newton_schulz):
+            X = 1.5*X - 0.5*X@(np.conj(X.T)@X)
+        A = np.conj(X.T)@X
+        A.flat[::self.p+1] -= 1
+        if np.linalg.norm(A) > self.tol_newton_schulz:
+            return None
+        return X
 
     def project_to_tangent_space(self, x, xi):
         """
@@ -77,7 +125,9 @@ class ComplexStiefelManifold:
         """
         temp = x.reshape((self.n, self.p))
         xi = xi.reshape((self.n, self.p))
-        return np.reshape(xi - 0.5 * temp@(np.conj(temp).T@xi + np.conj(xi).T@temp), self.shape)
+        # x^\dagger xi + xi^\dagger x = A + A^\dagger with A = x^\dagger xi, which saves one matrix product
+        temp2 = np.conj(temp).T@xi
+        return np.reshape(xi - 0.5 * temp@(temp2 + np.conj(temp2).T), self.shape)
 
     def inner_product(self, x, y):
         """
@@ -95,7 +145,7 @@ class ComplexStiefelManifold:
         result : float
             the inner product of x and y
         """
-        return np.real(np.tensordot(x.conj(), y, axes=x.ndim))
+        return np.real(np.vdot(x, y))
 
     def norm(self, x):
         """
@@ -141,4 +191,225 @@ class ComplexStiefelManifold:
         result : np.ndarray of shape self.shape
             zero tangent vector
         """
-        return np.zeros(self.shape, dtype=np.complex128)
\ No newline at end of file
+        return np.zeros(self.shape, dtype=np.complex128)
+
+class ComplexStiefelManifoldBatched(ComplexStiefelManifold):
+    """
+    Class implementing a batch of independent complex stiefel manifolds of the same shape. All tensors carry an additional
+    leading batch axis of arbitrary length B. The linear algebra is done on stacks of (n, p) matrices, such that a whole
+    batch of optimization problems is handled with a single call to numpy. Inner products and norms are computed per
+    problem and returned as arrays of shape (B,).
+    """
+
+    def retract(self, x, xi=None):
+        """
+        Retracts x + xi onto the manifold using the qr decomposition, for each element of the batch.
+        Extra steps are taken to ensure uniqueness of the qr decomposition. If self.retraction == "newton_schulz"
+        and xi is given, the Newton-Schulz iteration is used instead, and only the elements of the batch for which
+        it did not converge are retracted using the qr decomposition.
+
+        Parameters
+        ----------
+        x : np.ndarray of shape (B,) + self.shape, or reshapable into shape (B, n, m)
+            batch of elements from the embedding space.
+        xi : np.ndarray of shape (B,) + self.shape, or reshapable into shape (B, n, m)
+            batch of elements from the embedding space.
+
+        Returns
+        -------
+        result : np.ndarray of shape (B,) + self.shape
+            the retracted isometric tensors
+        """
+        temp = x.reshape((-1, self.n, self.p))
+        if xi is not None:
+            xi = xi.reshape((-1, self.n, self.p))
+            if self.retraction == "newton_schulz":
+                result, failed = self._retract_newton_schulz(temp, xi)
+                if np.any(failed):
+                    result[failed] = self._retract_qr(temp[failed] + xi[failed])
+                return np.reshape(result, (-1,) + tuple(self.shape))
+            temp = temp + xi
+        return np.reshape(self._retract_qr(temp), (-1,) + tuple(self.shape))
+
+    def _retract_qr(self, temp):
+        """
+        Computes the sign-fixed qr retraction of a stack of matrices.
+
+        Parameters
+        ----------
+        temp : np.ndarray of shape (B, n, m)
+            batch of elements from the embedding space.
+
+        Returns
+        -------
+        result : np.ndarray of shape (B, n, m)
+            the retracted isometries
+        """
+        Q, R = np.linalg.qr(temp)
+        return Q*np.sign(np.diagonal(R, axis1=1, axis2=2))[:, np.newaxis, :]
+
+    def _retract_newton_schulz(self, x, xi):
+        """
+        Batched version of ComplexStiefelManifold._retract_newton_schulz().
+
+        Parameters
+        ----------
+        x : np.ndarray of shape (B, n, m)
+            batch of elements of the complex stiefel manifold.
+        xi : np.ndarray of shape (B, n, m)
+            batch of tangent vectors.
+
+        Returns
+        -------
+        result : np.ndarray of shape (B, n, m)
+            the retracted isometries.
+        failed : np.ndarray of shape (B,) and dtype bool
+            mask of the elements of the batch for which the residual is larger than self.tol_newton_schulz.
+        """
+        X = (x + xi) / np.sqrt(1 + self.inner_product(xi, xi))[:, np.newaxis, np.newaxis]
+        for _ in range(self.N_iters_newton_schulz):
+            X = 1.5*X - 0.5*X@(np.conj(X).transpose(0, 2, 1)@X)
+        A = np.conj(X).transpose(0, 2, 1)@X - np.eye(self.p)
+        return X, self.norm(A) > self.tol_newton_schulz
+
+    def project_to_tangent_space(self, x, xi):
+        """
+        Projects xi to the tangent space of x, for each element of the batch.
+
+        Parameters
+        ----------
+        x : np.ndarray of shape (B,) + self.shape, or reshapable into shape (B, n, m)
+            batch of elements of the complex stiefel manifold. Must be isometries.
+            This is not explicitly checked by this function for performance reasons.
+        xi : np.ndarray of shape (B,) + self.shape, or reshapable into shape (B, n, m)
+            batch of elements of the embedding space.
+
+        Returns
+        -------
+        result : np.ndarray of shape (B,) + self.shape
+            the tangent vectors obtained by projecting xi to the tangent spaces of x
+        """
+        temp = x.reshape((-1, self.n, self.p))
+        xi = xi.reshape((-1, self.n, self.p))
+        temp2 = np.conj(temp).transpose(0, 2, 1)@xi
+        return np.reshape(xi - 0.5 * temp@(temp2 + np.conj(temp2).transpose(0, 2, 1)), (-1,) + tuple(self.shape))
+
+    def inner_product(self, x, y):
+        """
+        Computes the inner products of two batches of elements from the same tangent spaces.
+
+        Parameters
+        ----------
+        x : np.ndarray of shape (B,) + self.shape
+            first batch of tangent vectors
+        y : np.ndarray of shape (B,) + self.shape
+            second batch of tangent vectors
+
+        Returns
+        -------
+        result : np.ndarray of shape (B,)
+            the inner products of x and y
+        """
+        B = x.shape[0]
+        return np.real(np.einsum("bi,bi->b", np.conj(x.reshape(B, -1)), y.reshape(B, -1)))
+
+    def norm(self, x):
+        """
+        Computes the norms of a batch of tangent vectors x.
+
+        Parameters
+        ----------
+        x : np.ndarray of shape (B,) + self.shape
+            batch of tangent vectors
+
+        Returns
+        -------
+        result : np.ndarray of shape (B,)
+            the norms
+        """
+        return np.linalg.norm(x.reshape(x.shape[0], -1), axis=1)
+
+    def zero_vector(self, B):
+        """
+        Returns a batch of zero tangent vectors.
+
+        Parameters
+        ----------
+        B : int
+            batch size
+
+        Returns
+        -------
+        result : np.ndarray of shape (B,) + self.shape
+            batch of zero tangent vectors
+        """
+        return np.zeros((B,) + tuple(self.shape), dtype=np.complex128)
+
+@functools.lru_cache(maxsize=32)
+def identity_unitary(D1, D2):
+    """
+    Returns the identity as a disentangling unitary of shape (D1, D2, D1, D2), which is used as the initial iterate.
+    The result is cached, because the same shapes are disentangled over and over again during a TEBD sweep.
+    The cached array is set to read-only, callers must copy it before modifying it.
+
+    Parameters
+    ----------
+    D1, D2 : int
+        dimensions of the legs the disentangling unitary acts on.
+
+    Returns
+    -------
+    U0 : np.ndarray of shape (D1, D2, D1, D2)
+        identity, as complex tensor.
+    """
+    U0 = np.reshape(np.eye(D1*D2, dtype=np.complex128), (D1, D2, D1, D2))
+    U0.setflags(write=False)
+    return U0
+
+def initial_unitary(U0, D1, D2):
+    """
+    Returns the initial iterate of the disentanglers: U0 if it is given, otherwise the identity.
+
+    Parameters
+    ----------
+    U0 : np.ndarray of shape (D1, D2, D1, D2) or None
+        initial disentangling unitary, e.g. the result of disentangling a nearby wavefunction tensor.
+    D1, D2 : int
+        dimensions of the legs the disentangling unitary acts on.
+
+    Returns
+    -------
+    U0 : np.ndarray of shape (D1, D2, D1, D2)
+        initial disentangling unitary, as complex tensor.
+    """
+    if U0 is None:
+        return identity_unitary(D1, D2)
+    if U0.shape != (D1, D2, D1, D2):
+        raise ValueError(f"U0 must be of shape {(D1, D2, D1, D2)}, but is of shape {U0.shape}")
+    return np.asarray(U0, dtype=np.complex128)
+
+@functools.lru_cache(maxsize=32)
+def unitary_manifold(D1, D2, batched=False, retraction="qr", N_iters_newton_schulz=3, tol_newton_schulz=1e-10):
+    """
+    Returns the complex stiefel manifold of disentangling unitaries of shape (D1, D2, D1, D2). The manifold classes
+    do not carry any state besides their shape and retraction options, so a single instance is shared between all
+    calls with the same arguments. The optimizers are constructed per call, since they hold the construct_iterate
+    function that captures theta.
+
+    Parameters
+    ----------
+    D1, D2 : int
+        dimensions of the legs the disentangling unitary acts on.
+    batched : bool, optional
+        if this is set to True, the batched manifold ComplexStiefelManifoldBatched is returned. Default: False.
+    retraction, N_iters_newton_schulz, tol_newton_schulz :
+        passed into the constructor of the manifold, see ComplexStiefelManifold.
+
+    Returns
+    -------
+    manifold : ComplexStiefelManifold or ComplexStiefelManifoldBatched
+        the manifold.
+    """
+    if batched:
+        return ComplexStiefelManifoldBatched(n=D1*D2, p=D1*D2, shape=(D1, D2, D1, D2), retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
+    return ComplexStiefelManifold(n=D1*D2, p=D1*D2, shape=(D1, D2, D1, D2), retraction=retraction, N_iters_newton_schulz=N_iters_newton_schulz, tol_newton_schulz=tol_newton_schulz)
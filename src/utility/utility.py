@@ -2,6 +2,10 @@ import numpy as np
 import scipy
 import scipy.linalg
 import hdfdict
+try:
+    import cupy
+except ImportError:
+    cupy = None
 
 """
 This file implements several utility functions that are used throughout the code base
@@ -43,6 +47,80 @@ def safe_svd(A, full_matrices=True):
             return np.zeros(m, k), np.zeros(k), np.zeros(k, n)
         return U, S, V
 
+def truncated_svd(A, chi, rtol=1e-6, min_dim_partial=64, max_chi_fraction_partial=0.25, backend="numpy", min_size_gpu=1024):
+    """
+    Computes the chi largest singular values and the corresponding singular vectors of A, such that A is approximated by U@np.diag(S)@V.
+    Instead of a full SVD, only the chi largest eigenpairs of the smaller of the two Gram matrices A@conj(A.T) and
+    conj(A.T)@A are computed using a partial hermitian eigensolver. The other singular vectors follow from a single matrix
+    product, which is re-orthonormalized with a thin QR decomposition and an SVD of the small (chi, chi) triangular
+    factor, such that both returned factors are isometric to machine precision. Because forming the Gram matrix squares the condition number, the full (safe) SVD is used
+    instead if the ratio S[chi-1]/S[0] is smaller than rtol. The partial eigensolver is only faster than the full SVD if
+    chi is a small fraction of min(n, m) and the matrix is not too small, so matrices with min(n, m) < min_dim_partial
+    or chi > max_chi_fraction_partial*min(n, m) are also decomposed with the full SVD.
+    With backend="cupy", matrices with at least min_size_gpu entries are instead copied to the GPU and decomposed there
+    with a full SVD. Only the truncated factors are copied back.
+
+    Parameters
+    ----------
+    A : np.ndarray of shape (n, m)
+        The matrix that should be decomposed.
+    chi : int
+        number of singular values that are kept. Should be >= 1.
+    rtol : float, optional
+        smallest ratio of the kept singular values S[chi-1]/S[0] for which the result of the partial eigensolver is
+        used. Default: 1e-6.
+    min_dim_partial : int, optional
+        smallest value of min(n, m) for which the partial eigensolver is used. Default: 64.
+    max_chi_fraction_partial : float, optional
+        largest ratio chi/min(n, m) for which the partial eigensolver is used. Default: 0.25.
+    backend : str, one of {"numpy", "cupy"}, optional
+        backend used for the decomposition. "cupy" requires the optional dependency cupy and a CUDA device. Default: "numpy".
+    min_size_gpu : int, optional
+        smallest number of entries n*m of A for which the decomposition is done on the GPU if backend="cupy".
+        Smaller matrices are decomposed on the CPU, since the transfer overhead dominates. Default: 1024.
+
+    Returns
+    -------
+    U : np.ndarray of shape (n, chi)
+        isometric matrix.
+    S : np.ndarray of shape (chi, )
+        vector containing the chi largest singular values in descending order.
+    V : np.ndarray of shape (chi, m)
+        V.T is an isometric matrix.
+    """
+    n, m = A.shape
+    if backend == "cupy":
+        if cupy is None:
+            raise ImportError("backend \"cupy\" requires cupy to be installed!")
+        if A.size >= min_size_gpu:
+            U, S, V = cupy.linalg.svd(cupy.asarray(A), full_matrices=False)
+            return cupy.asnumpy(U[:, :chi]), cupy.asnumpy(S[:chi]), cupy.asnumpy(V[:chi, :])
+    elif backend != "numpy":
+        raise NotImplementedError(f"backend \"{backend}\" is not implemented!")
+    if min_dim_partial <= min(n, m) and chi <= max_chi_fraction_partial*min(n, m):
+        AH = np.conj(A.T)
+        if n <= m:
+            w, U = scipy.linalg.eigh(A@AH, subset_by_index=[n-chi, n-1], driver="evr")
+        else:
+            w, U = scipy.linalg.eigh(AH@A, subset_by_index=[m-chi, m-1], driver="evr")
+        # scipy returns the eigenvalues in ascending order
+        S = np.sqrt(np.maximum(w[::-1], 0.0))
+        U = U[:, ::-1]
+        if S[0] > 0 and S[-1] >= rtol*S[0]:
+            # The other factor, A^dagger U (or A U), loses orthonormality as S[chi-1]/S[0] gets small.
+            # It is re-orthonormalized with a thin QR, and R is folded into S and V with an SVD of size (chi, chi).
+            if n <= m:
+                Q, R = np.linalg.qr(AH@U) # A ~ U @ conj(R.T) @ conj(Q.T)
+                u, S, v = np.linalg.svd(np.conj(R.T))
+                return U@u, S, v@np.conj(Q.T)
+            else:
+                Q, R = np.linalg.qr(A@U) # A ~ Q @ R @ conj(U.T)
+                u, S, v = np.linalg.svd(R)
+                return Q@u, S, v@np.conj(U.T)
+    # Both numpy and scipy return the singular values in descending order
+    U, S, V = safe_svd(A, full_matrices=False)
+    return U[:, :chi], S[:chi], V[:chi, :]
+
 def split_and_truncate(A, chi_max=0, eps=0):
     """
     Performs an SVD of the matrix A and truncates the singular values to the bond dimension chi_max.